@@ -0,0 +1,43 @@
+"""
+Gunicorn configuration for the Priroda Kiosk.
+
+The app is preloaded in the master process: the menu tree, precache
+manifest and compiled templates are built once, frozen out of the
+garbage collector, and then shared copy-on-write by the forked workers
+instead of each worker building its own copy.
+
+Usage:
+    gunicorn -c config/gunicorn.conf.py server.app:app
+"""
+
+import gc
+
+preload_app = True
+
+# wsgi.file_wrapper responses (content images, see server/fastpath.py) go
+# out with os.sendfile(), without copying the file through Python
+sendfile = True
+
+# Keep collections from compacting or touching the master's objects
+# before they are frozen; see the gc.freeze() documentation
+gc.disable()
+
+
+def when_ready(server):
+    """Build shared state in the master once the app is loaded."""
+    from server.app import reset_cache_stats, use_shared_caches, warm_up
+
+    use_shared_caches()
+    warm_up()
+    reset_cache_stats()
+    gc.freeze()
+    server.log.info("Content index built and frozen (%d objects)", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    """Workers collect garbage as usual, skipping the frozen objects."""
+    from server.app import reset_cache_stats
+
+    # Count only this worker's requests
+    reset_cache_stats()
+    gc.enable()
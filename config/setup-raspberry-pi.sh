@@ -37,11 +37,13 @@ apt-get install -y \
     python3-pip \
     python3-venv \
     chromium-browser \
+    fonts-open-sans \
     unclutter \
     xdotool \
     x11-xserver-utils \
     curl \
-    git
+    git \
+    make
 
 # Create log directory
 echo ""
@@ -66,6 +68,10 @@ echo "[5/8] Setting up Python virtual environment..."
 su - "$PI_USER" -c "cd $INSTALL_DIR && python3 -m venv venv"
 su - "$PI_USER" -c "cd $INSTALL_DIR && ./venv/bin/pip install --upgrade pip"
 su - "$PI_USER" -c "cd $INSTALL_DIR && ./venv/bin/pip install -r requirements.txt"
+su - "$PI_USER" -c "cd $INSTALL_DIR && ./venv/bin/python scripts/build-fonts.py"
+su - "$PI_USER" -c "cd $INSTALL_DIR && ./venv/bin/python scripts/build-assets.py"
+# Image pack, content database, search and facet indexes, sprites (make deploy reruns this)
+su - "$PI_USER" -c "cd $INSTALL_DIR && make content-build"
 
 # Make scripts executable
 echo ""
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Compare the filesystem and SQLite content backends.
+
+For each content tree and backend, a fresh Python process builds the menu,
+loads a sample of pages with get_page_content() and requests the same
+pages through the Flask app with the render and fragment caches emptied
+before every request, then reports timings and memory use. The children
+use in-process caches only (the shared cache file is gunicorn's). Two trees are measured: the real content/
+tree and a generated one with --nodes directories of markdown pages.
+
+Usage:
+    python benchmark-content.py                 # Real tree + 100k-node synthetic tree
+    python benchmark-content.py --nodes 20000   # Smaller synthetic tree
+    python benchmark-content.py --real-only     # Skip the synthetic tree
+
+The synthetic tree and its database are written to a temporary directory
+and removed afterwards.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+BACKENDS = ['filesystem', 'sqlite']
+
+SYNTHETIC_SECTIONS = 10
+SYNTHETIC_FANOUT = 10  # Subdirectories per category below the sections
+
+LOREM = ("Chráněná krajinná oblast leží na rozhraní Hrubého Jeseníku a Nízkého "
+         "Jeseníku. Území je charakteristické smrkovými lesy, rašeliništi a "
+         "prameništi, ve kterých žije řada vzácných druhů rostlin a živočichů.")
+
+
+# =============================================================================
+# Synthetic Content
+# =============================================================================
+
+def write_page(dir_path: Path, filename: str, title: str, paragraphs: int):
+    dir_path.mkdir(parents=True, exist_ok=True)
+    body = '\n\n'.join(LOREM for _ in range(paragraphs))
+    (dir_path / filename).write_text(f"---\ntitle: {title}\n---\n\n## {title}\n\n{body}\n",
+                                     encoding='utf-8')
+
+
+def generate_tree(root: Path, nodes: int):
+    """Write a content tree with about `nodes` directories: 3 category levels plus leaves."""
+    categories = SYNTHETIC_SECTIONS * (1 + SYNTHETIC_FANOUT + SYNTHETIC_FANOUT ** 2)
+    leaves_per_category = max(1, (nodes - categories) // (SYNTHETIC_SECTIONS * SYNTHETIC_FANOUT ** 2))
+
+    menu = ["sections:"]
+    for s in range(SYNTHETIC_SECTIONS):
+        section = root / f"sekce-{s}"
+        menu.append(f"- id: sekce-{s}\n  title: Sekce {s}")
+        write_page(section, '_index.md', f"Sekce {s}", 1)
+        for a in range(SYNTHETIC_FANOUT):
+            group = section / f"skupina-{a}"
+            write_page(group, '_index.md', f"Skupina {s}.{a}", 1)
+            for b in range(SYNTHETIC_FANOUT):
+                category = group / f"kategorie-{b}"
+                write_page(category, '_index.md', f"Kategorie {s}.{a}.{b}", 1)
+                for c in range(leaves_per_category):
+                    write_page(category / f"stranka-{c}", 'page.md', f"Stránka {s}.{a}.{b}.{c}", 4)
+
+    (root / 'menu.yaml').write_text('\n'.join(menu) + '\n', encoding='utf-8')
+    return categories + SYNTHETIC_SECTIONS * SYNTHETIC_FANOUT ** 2 * leaves_per_category
+
+
+# =============================================================================
+# Measurement (runs in a child process per tree and backend)
+# =============================================================================
+
+def rss_mb() -> float:
+    """Current resident set size."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        'mean': sum(samples) / len(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[int(len(samples) * 0.95)],
+    }
+
+
+def measure(content_dir: Path, backend: str, db_path: Path, sample: int) -> dict:
+    """Time menu build, page loads and page requests with one backend."""
+    import server.content as content
+    content.CONTENT_DIR = content_dir
+
+    from server import app as app_module
+    from server.content_sqlite import SQLiteBackend
+    app = app_module.app
+    if backend == 'sqlite':
+        content.set_backend(SQLiteBackend(db_path, content_dir))
+    result = {'rss_start_mb': rss_mb()}
+
+    start = time.perf_counter()
+    menu = app_module.get_menu()
+    result['menu_ms'] = (time.perf_counter() - start) * 1000
+    result['rss_menu_mb'] = rss_mb()
+
+    urls = sorted(menu['by_url'])
+    random.Random(1).shuffle(urls)
+    urls = urls[:sample]
+
+    timings = []
+    for url in urls:
+        start = time.perf_counter()
+        content.get_page_content(url)
+        timings.append((time.perf_counter() - start) * 1000)
+    result['page_ms'] = percentiles(timings)
+
+    client = app.test_client()
+    timings = []
+    for url in urls:
+        # Time rendering, not cache lookups
+        app_module.reset_caches()
+        start = time.perf_counter()
+        response = client.get(f"/{url}")
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, (url, response.status_code)
+    result['request_ms'] = percentiles(timings)
+
+    result['rss_end_mb'] = rss_mb()
+    result['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result['pages'] = len(urls)
+    return result
+
+
+def run_child(content_dir: Path, backend: str, db_path: Path, sample: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', backend, '--content-dir', str(content_dir),
+         '--db', str(db_path), '--sample', str(sample)],
+        check=True, capture_output=True, text=True, cwd=BASE_DIR).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compile_tree(content_dir: Path, db_path: Path) -> float:
+    """Compile a tree in a child process; returns seconds."""
+    code = ("import sys; from pathlib import Path; import server.content as c; "
+            "c.CONTENT_DIR = Path(sys.argv[1]); "
+            "from server.content_sqlite import compile_database; "
+            "compile_database(Path(sys.argv[2]), c.CONTENT_DIR)")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code, str(content_dir), str(db_path)],
+                   check=True, cwd=BASE_DIR, env={**os.environ, 'PYTHONPATH': str(BASE_DIR)})
+    return time.perf_counter() - start
+
+
+# =============================================================================
+# Report
+# =============================================================================
+
+def benchmark_tree(label: str, content_dir: Path, db_path: Path, sample: int):
+    print(f"\n{label}")
+    print("-" * 70)
+    print(f"  Compiled database in {compile_tree(content_dir, db_path):.1f} s "
+          f"({db_path.stat().st_size / 1024 / 1024:.1f} MB)")
+
+    results = {backend: run_child(content_dir, backend, db_path, sample) for backend in BACKENDS}
+
+    rows = [
+        ('Menu build (ms)', lambda r: r['menu_ms']),
+        ('get_page_content mean (ms)', lambda r: r['page_ms']['mean']),
+        ('get_page_content p95 (ms)', lambda r: r['page_ms']['p95']),
+        ('Request mean (ms)', lambda r: r['request_ms']['mean']),
+        ('Request p50 (ms)', lambda r: r['request_ms']['p50']),
+        ('Request p95 (ms)', lambda r: r['request_ms']['p95']),
+        ('RSS after menu (MB)', lambda r: r['rss_menu_mb']),
+        ('Max RSS (MB)', lambda r: r['max_rss_mb']),
+    ]
+    print(f"  {'':<30} {'filesystem':>14} {'sqlite':>14}")
+    for name, value in rows:
+        print(f"  {name:<30} {value(results['filesystem']):>14.2f} {value(results['sqlite']):>14.2f}")
+    print(f"  ({results['filesystem']['pages']} pages sampled)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark content backends')
+    parser.add_argument('--nodes', type=int, default=100000,
+                        help='Directories in the synthetic tree (default: 100000)')
+    parser.add_argument('--sample', type=int, default=1000,
+                        help='Pages loaded and requested per run (default: 1000)')
+    parser.add_argument('--real-only', action='store_true', help='Skip the synthetic tree')
+    parser.add_argument('--child', choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument('--content-dir', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--db', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.content_dir, args.child, args.db, args.sample)))
+        return
+
+    from server.content import CONTENT_DIR
+
+    print("=" * 70)
+    print("CONTENT BACKEND BENCHMARK")
+    print("=" * 70)
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix='priroda-benchmark-'))
+    try:
+        benchmark_tree(f"Real tree ({CONTENT_DIR})", CONTENT_DIR, tmp_dir / 'real.sqlite', args.sample)
+
+        if not args.real_only:
+            synthetic_dir = tmp_dir / 'content'
+            start = time.perf_counter()
+            count = generate_tree(synthetic_dir, args.nodes)
+            print(f"\nGenerated {count} synthetic nodes in {time.perf_counter() - start:.1f} s")
+            benchmark_tree(f"Synthetic tree ({count} nodes)", synthetic_dir,
+                           tmp_dir / 'synthetic.sqlite', args.sample)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
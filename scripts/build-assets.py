@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Build bundled, minified and fingerprinted CSS/JS for the kiosk.
+
+Concatenates the source files listed in server/assets.py BUNDLES (CSS
+@import rules are inlined), minifies them, names each bundle by content
+hash and writes it to server/static/dist/ together with precompressed
+.br and .gz variants. assets.json maps bundle names to the built files;
+base.html links the bundles through it and the /static/dist route serves
+the precompressed variant the browser accepts.
+
+Usage:
+    python build-assets.py
+
+Requires rcssmin, rjsmin and brotli.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+import brotli
+import rcssmin
+import rjsmin
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from server.assets import STATIC_DIR, DIST_DIR, ASSET_MANIFEST, BUNDLES
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+CSS_IMPORT_RE = re.compile(r"""@import\s+url\(\s*['"]?([^'")]+)['"]?\s*\)\s*;""")
+
+
+# =============================================================================
+# Bundling
+# =============================================================================
+
+def read_css(path, seen=None):
+    """Read a CSS file with its local @import rules inlined."""
+    seen = seen if seen is not None else set()
+    if path in seen:
+        return ''
+    seen.add(path)
+
+    css = path.read_text(encoding='utf-8')
+
+    def inline_import(match):
+        return read_css((path.parent / match.group(1)).resolve(), seen)
+
+    return CSS_IMPORT_RE.sub(inline_import, css)
+
+
+def build_bundle(name, sources):
+    """Concatenate and minify a bundle's sources."""
+    if name.endswith('.css'):
+        seen = set()
+        parts = [read_css((STATIC_DIR / src).resolve(), seen) for src in sources]
+        return rcssmin.cssmin('\n'.join(parts))
+
+    parts = []
+    for src in sources:
+        js = (STATIC_DIR / src).read_text(encoding='utf-8')
+        # htmx.min.js is already minified; re-minifying gains nothing
+        parts.append(js if src.endswith('.min.js') else rjsmin.jsmin(js))
+    # Separate with ';' so files without a trailing semicolon stay valid
+    return ';\n'.join(parts)
+
+
+def fingerprint(data):
+    """Short content hash used in the file name."""
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def write_precompressed(path, data):
+    """Write .br and .gz siblings of a built file."""
+    path.with_name(path.name + '.br').write_bytes(
+        brotli.compress(data, mode=brotli.MODE_TEXT, quality=11))
+    path.with_name(path.name + '.gz').write_bytes(
+        gzip.compress(data, compresslevel=9, mtime=0))
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    print("=" * 70)
+    print("BUILD STATIC ASSETS")
+    print("=" * 70)
+
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Remove previous fingerprinted builds
+    for old_file in DIST_DIR.iterdir():
+        if old_file.is_file():
+            old_file.unlink()
+
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        data = build_bundle(name, sources).encode('utf-8')
+        stem, ext = name.rsplit('.', 1)
+        filename = f"{stem}.{fingerprint(data)}.{ext}"
+        out_path = DIST_DIR / filename
+        out_path.write_bytes(data)
+        write_precompressed(out_path, data)
+
+        src_size = sum((STATIC_DIR / src).stat().st_size for src in sources)
+        br_size = out_path.with_name(filename + '.br').stat().st_size
+        gz_size = out_path.with_name(filename + '.gz').stat().st_size
+        print(f"  ✓ {filename}: {src_size // 1024} KB sources → {len(data) // 1024} KB "
+              f"(br {br_size // 1024} KB, gz {gz_size // 1024} KB)")
+
+        manifest[name] = {'file': f"dist/{filename}", 'sources': sources}
+
+    with open(ASSET_MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+
+    print(f"\n✓ Wrote {len(manifest)} bundles and {ASSET_MANIFEST.relative_to(BASE_DIR)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compile the content/ tree into a SQLite database.
+
+Writes build/content.sqlite (see server/content_sqlite.py for the schema)
+with every page's HTML pre-rendered. The server reads it instead of
+content/ when CONTENT_BACKEND is 'sqlite' in server/app.py. Rebuild after
+editing content.
+
+Usage:
+    python build-content-db.py                       # Write build/content.sqlite
+    python build-content-db.py -o /path/content.db   # Write elsewhere
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from server.content_sqlite import compile_database
+
+DEFAULT_OUTPUT = BASE_DIR / 'build' / 'content.sqlite'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile content/ into a SQLite database')
+    parser.add_argument('-o', '--output', type=Path, default=DEFAULT_OUTPUT,
+                        help=f'Database path (default: {DEFAULT_OUTPUT.relative_to(BASE_DIR)})')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BUILD CONTENT DATABASE")
+    print("=" * 70)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    count = compile_database(args.output)
+    elapsed = time.perf_counter() - start
+
+    size = args.output.stat().st_size
+    print(f"  ✓ {count} nodes in {elapsed:.1f} s, {size / 1024 / 1024:.1f} MB")
+    print(f"\n✓ Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
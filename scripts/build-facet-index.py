@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Build the facet index for browsing across the menu.
+
+Derives habitat, organism group, district and locality category facets
+from the content paths (see server/facets.py), indexes the photos of all
+galleries in the same page order (server/photos.py) and writes
+build/facets.idx, which the server loads at startup for /browse, /photos
+and /mapa. Part of the content build; rebuild after editing content.
+
+Usage:
+    python build-facet-index.py                   # Write build/facets.idx
+    python build-facet-index.py -o /path/x.idx    # Write elsewhere
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from server.content import build_menu_tree
+from server.facets import FacetIndex, FACETS
+
+DEFAULT_OUTPUT = BASE_DIR / 'build' / 'facets.idx'
+
+# Cross-cutting selections timed after the build
+SAMPLE_SELECTIONS = [
+    {'group': 'zivocichove'},
+    {'district': 'okres-prerov'},
+    {'district': 'okres-jesenik', 'category': 'mineralogicke-lokality'},
+    {'habitat': 'rybnik', 'group': 'rostliny'},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the facet index')
+    parser.add_argument('-o', '--output', type=Path, default=DEFAULT_OUTPUT,
+                        help=f'Index path (default: {DEFAULT_OUTPUT.relative_to(BASE_DIR)})')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BUILD FACET INDEX")
+    print("=" * 70)
+
+    menu = build_menu_tree()
+    index = FacetIndex.build(menu)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    index.save(args.output)
+
+    print(f"  ✓ {len(index.pages)} pages, {len(index.photos)} photos")
+    for facet in FACETS:
+        print(f"  {facet:<10} {len(index.values[facet]):>3} values")
+
+    loaded = FacetIndex.load(args.output, menu['version'])
+    for selection in SAMPLE_SELECTIONS:
+        start = time.perf_counter()
+        bits = loaded.select(**selection)
+        elapsed = (time.perf_counter() - start) * 1_000_000
+        print(f"  {str(selection):<62} {bits.bit_count():>4} pages {elapsed:>6.1f} µs")
+
+    start = time.perf_counter()
+    pages = 0
+    while loaded.photos.slice(loaded.all, pages * 24, (pages + 1) * 24):
+        pages += 1
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"  All photos in {pages} pages of 24: {elapsed / pages:.2f} ms per page")
+
+    print(f"\n✓ Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
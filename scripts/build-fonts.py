@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Build self-hosted Open Sans web fonts for the kiosk.
+
+Subsets Open Sans to Basic Latin, Latin-1 and the Czech letters from
+Latin Extended-A, keeps only the weights the CSS uses, and writes
+fingerprinted WOFF2 files to server/static/fonts/ together with
+fonts.json, which base.html reads for @font-face rules and preload hints.
+
+Source fonts are the static Open Sans TTFs, e.g. from the Debian/Raspberry
+Pi OS package `fonts-open-sans`:
+
+    /usr/share/fonts/truetype/open-sans/OpenSans-Regular.ttf
+    /usr/share/fonts/truetype/open-sans/OpenSans-Semibold.ttf
+    ...
+
+Usage:
+    python build-fonts.py
+    python build-fonts.py --source /path/to/open-sans/ttf
+
+Requires fonttools and brotli (WOFF2 compression).
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import sys
+from pathlib import Path
+
+from fontTools import subset
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+BASE_DIR = Path(__file__).parent.parent
+FONTS_DIR = BASE_DIR / 'server' / 'static' / 'fonts'
+MANIFEST_FILE = FONTS_DIR / 'fonts.json'
+DEFAULT_SOURCE = Path('/usr/share/fonts/truetype/open-sans')
+
+FAMILY = 'Open Sans'
+
+# Faces used by kiosk.css (400/600/700) plus italic for <em> in page text.
+# Source file names differ between distributions, so each face lists
+# candidates in order of preference.
+FACES = [
+    {'weight': 400, 'style': 'normal', 'preload': True,
+     'sources': ['OpenSans-Regular.ttf']},
+    {'weight': 600, 'style': 'normal', 'preload': True,
+     'sources': ['OpenSans-SemiBold.ttf', 'OpenSans-Semibold.ttf']},
+    {'weight': 700, 'style': 'normal', 'preload': False,
+     'sources': ['OpenSans-Bold.ttf']},
+    {'weight': 400, 'style': 'italic', 'preload': False,
+     'sources': ['OpenSans-Italic.ttf']},
+]
+
+# Basic Latin, Latin-1, Czech letters (ČčĎďĚěŇňŘřŠšŤťŮůŽž) and the
+# typographic punctuation found in the content (dashes, quotes, ellipsis)
+UNICODE_RANGE = [
+    'U+0020-007E',
+    'U+00A0-00FF',
+    'U+010C-010F',
+    'U+011A-011B',
+    'U+0147-0148',
+    'U+0158-0159',
+    'U+0160-0161',
+    'U+0164-0165',
+    'U+016E-016F',
+    'U+017D-017E',
+    'U+2013-2014',
+    'U+2018-201E',
+    'U+2022',
+    'U+2026',
+    'U+20AC',
+]
+
+
+# =============================================================================
+# Subsetting
+# =============================================================================
+
+def parse_unicode_range(ranges):
+    """Expand 'U+XXXX-YYYY' strings into a list of code points."""
+    codepoints = []
+    for entry in ranges:
+        bounds = entry[2:].split('-')
+        start = int(bounds[0], 16)
+        end = int(bounds[-1], 16)
+        codepoints.extend(range(start, end + 1))
+    return codepoints
+
+
+def find_source(source_dir, candidates):
+    """Return the first existing source font for a face."""
+    for name in candidates:
+        path = source_dir / name
+        if path.exists():
+            return path
+    return None
+
+
+def subset_font(src_path, codepoints):
+    """Subset a TTF to the given code points and return WOFF2 bytes."""
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['kern', 'liga', 'calt', 'ccmp', 'locl', 'mark', 'mkmk']
+    options.hinting = False
+    options.desubroutinize = True
+    options.name_IDs = [1, 2]
+
+    font = subset.load_font(str(src_path), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+
+    buffer = io.BytesIO()
+    subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+
+def fingerprint(data):
+    """Short content hash used in the file name."""
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Build subset WOFF2 web fonts')
+    parser.add_argument('--source', '-s', type=Path, default=DEFAULT_SOURCE,
+                        help='Directory with Open Sans TTF files')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BUILD WEB FONTS")
+    print("=" * 70)
+
+    FONTS_DIR.mkdir(parents=True, exist_ok=True)
+    codepoints = parse_unicode_range(UNICODE_RANGE)
+
+    # Resolve all sources first so a missing file does not leave a
+    # half-built font directory behind
+    sources = []
+    for face in FACES:
+        src_path = find_source(args.source, face['sources'])
+        if not src_path:
+            print(f"ERROR: No source for {FAMILY} {face['weight']} {face['style']} "
+                  f"in {args.source} (tried {', '.join(face['sources'])})")
+            sys.exit(1)
+        sources.append((face, src_path))
+
+    # Remove previous fingerprinted builds
+    for old_file in FONTS_DIR.glob('open-sans-*.woff2'):
+        old_file.unlink()
+
+    faces = []
+    for face, src_path in sources:
+        data = subset_font(src_path, codepoints)
+        name = f"open-sans-{face['weight']}-{face['style']}.{fingerprint(data)}.woff2"
+        (FONTS_DIR / name).write_bytes(data)
+
+        src_size = src_path.stat().st_size
+        print(f"  ✓ {name}: {src_size // 1024} KB → {len(data) // 1024} KB")
+
+        faces.append({
+            'family': FAMILY,
+            'weight': face['weight'],
+            'style': face['style'],
+            'file': f"fonts/{name}",
+            'preload': face['preload'],
+        })
+
+    manifest = {
+        'unicode_range': ', '.join(UNICODE_RANGE),
+        'faces': faces,
+    }
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+
+    print(f"\n✓ Wrote {len(faces)} faces and {MANIFEST_FILE.relative_to(BASE_DIR)}")
+
+
+if __name__ == '__main__':
+    main()
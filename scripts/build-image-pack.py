@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Pack all content images into one memory-mappable archive.
+
+Copies every tile and gallery image under content/ into build/images.pack
+(see server/imagepack.py for the format). The server maps the archive and
+serves images from it instead of opening each file; images that are not
+in the archive, or were edited after it was built, are served from
+content/ as before. Rebuild after changing images.
+
+Usage:
+    python build-image-pack.py                  # Write build/images.pack
+    python build-image-pack.py -o /path/x.pack  # Write elsewhere
+"""
+
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from server.content import CONTENT_DIR
+from server.imagepack import ImagePack, find_images, write_pack
+
+DEFAULT_OUTPUT = BASE_DIR / 'build' / 'images.pack'
+
+
+def file_sha256(path: Path) -> str:
+    """Checksum of the whole archive, for verifying deploys."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack content images into one archive')
+    parser.add_argument('-o', '--output', type=Path, default=DEFAULT_OUTPUT,
+                        help=f'Archive path (default: {DEFAULT_OUTPUT.relative_to(BASE_DIR)})')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BUILD IMAGE PACK")
+    print("=" * 70)
+
+    images = find_images(CONTENT_DIR)
+    source_size = sum(image.stat().st_size for image in images)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    count = write_pack(args.output, CONTENT_DIR, images)
+
+    pack = ImagePack.open(args.output)
+    if pack is None or len(pack.images) != count:
+        print(f"✗ {args.output} could not be read back")
+        sys.exit(1)
+
+    pack_size = args.output.stat().st_size
+    print(f"  ✓ {count} images, {source_size / 1024 / 1024:.1f} MB "
+          f"→ {pack_size / 1024 / 1024:.1f} MB archive (page aligned)")
+    print(f"  sha256 {file_sha256(args.output)}")
+    print(f"\n✓ Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
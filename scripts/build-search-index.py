@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Build the full-text search index.
+
+Indexes page titles, page text and gallery captions (see server/search.py),
+computes the related pages of each page (server/related.py) and writes
+build/search.idx, which the server loads at startup. Part of the content
+build; rebuild after editing content. Without a current index file the
+server builds the index in memory when it starts.
+
+Usage:
+    python build-search-index.py                  # Write build/search.idx
+    python build-search-index.py -o /path/x.idx   # Write elsewhere
+    python build-search-index.py --synthetic 100000
+                                                  # Also time suggestions on
+                                                  # 100k generated titles
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from server.content import build_menu_tree
+from server.search import SearchIndex, SuggestIndex
+
+DEFAULT_OUTPUT = BASE_DIR / 'build' / 'search.idx'
+
+# Queries timed after the build
+SAMPLE_QUERIES = ['zizala', 'jeskyne', 'jehlicnaty les', 'buk lesni', 'chranena krajinna oblast']
+
+# Typed one key at a time when timing suggestions
+SAMPLE_TYPING = ['racek chechtavy', 'buk lesni', 'abies alba', 'ramzova']
+
+SYLLABLES = ['ba', 'bo', 'ce', 'ci', 'da', 'dě', 'ha', 'je', 'ka', 'ko', 'la', 'le', 'ma', 'mo',
+             'na', 'ní', 'po', 'ra', 'ro', 'sa', 'ta', 'to', 'va', 'vý', 'za', 'ži', 'ček', 'rák']
+
+
+def synthetic_entries(count: int):
+    """Generated [title, species, url] entries of two to three made-up words."""
+    rng = random.Random(1)
+
+    def word():
+        return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    return [
+        [' '.join(word() for _ in range(rng.randint(2, 3))).capitalize(),
+         f"{word().capitalize()} {word()}", f"synteticke/{number}"]
+        for number in range(count)
+    ]
+
+
+def time_typing(suggestions: SuggestIndex, phrases):
+    """Worst and mean time per keystroke, typing each phrase key by key."""
+    timings = []
+    for phrase in phrases:
+        for end in range(1, len(phrase) + 1):
+            start = time.perf_counter()
+            suggestions.suggest(phrase[:end])
+            timings.append((time.perf_counter() - start) * 1000)
+    print(f"  Suggestions: {len(timings)} keystrokes, mean {sum(timings) / len(timings):.2f} ms, "
+          f"max {max(timings):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the full-text search index')
+    parser.add_argument('-o', '--output', type=Path, default=DEFAULT_OUTPUT,
+                        help=f'Index path (default: {DEFAULT_OUTPUT.relative_to(BASE_DIR)})')
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help='Also time suggestions on N generated titles')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BUILD SEARCH INDEX")
+    print("=" * 70)
+
+    menu = build_menu_tree()
+    start = time.perf_counter()
+    index = SearchIndex.build(menu)
+    elapsed = time.perf_counter() - start
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    index.save(args.output)
+    print(f"  ✓ {len(index.docs)} documents in {elapsed:.1f} s, "
+          f"{args.output.stat().st_size // 1024} KB")
+
+    loaded = SearchIndex.load(args.output, menu['version'])
+    for query in SAMPLE_QUERIES:
+        start = time.perf_counter()
+        results = loaded.search(query)
+        print(f"  {query!r:<30} {len(results):>3} results {(time.perf_counter() - start) * 1000:>7.2f} ms")
+    time_typing(loaded.suggestions, SAMPLE_TYPING)
+
+    if args.synthetic:
+        entries = synthetic_entries(args.synthetic)
+        start = time.perf_counter()
+        suggestions = SuggestIndex.from_entries(entries)
+        print(f"\n  Synthetic suggestion index: {len(entries)} entries in "
+              f"{time.perf_counter() - start:.1f} s")
+        rng = random.Random(2)
+        phrases = [rng.choice(entries)[rng.randint(0, 1)].lower() for _ in range(50)]
+        time_typing(suggestions, phrases)
+
+    print(f"\n✓ Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
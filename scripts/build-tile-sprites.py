@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Build tile sprite sheets, one per tile grid page.
+
+Crops the tiles of every tile page to square cells and packs them into one
+fingerprinted JPEG per page, with the CSS coordinates of each tile in
+sprites.json (see server/sprites.py). A tile page then paints with one
+image request instead of one per tile. Writes server/static/dist/sprites;
+part of the content build, rebuild after editing content or tiles.
+
+Usage:
+    python build-tile-sprites.py                  # Write server/static/dist/sprites
+    python build-tile-sprites.py --per-page 12    # Match a changed ITEMS_PER_PAGE
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from server.content import build_menu_tree
+from server.sprites import build_sprite_sheets, SPRITE_DIR, SPRITE_CELL
+
+# Tiles per page, as ITEMS_PER_PAGE in server/app.py
+DEFAULT_PER_PAGE = 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build tile sprite sheets')
+    parser.add_argument('--per-page', type=int, default=DEFAULT_PER_PAGE,
+                        help=f'Tiles per page (default: {DEFAULT_PER_PAGE})')
+    parser.add_argument('--cell', type=int, default=SPRITE_CELL,
+                        help=f'Cell edge in pixels (default: {SPRITE_CELL})')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BUILD TILE SPRITES")
+    print("=" * 70)
+
+    menu = build_menu_tree()
+    manifest = build_sprite_sheets(menu, args.per_page, SPRITE_DIR, args.cell)
+
+    sheets = [sheet for parent_pages in manifest['pages'].values() for sheet in parent_pages if sheet]
+    tiles = sum(len(sheet['positions']) for sheet in sheets)
+    files = list(SPRITE_DIR.glob('*.jpg'))
+    size = sum(path.stat().st_size for path in files)
+
+    print(f"  ✓ {len(sheets)} tile pages, {tiles} tiles in {len(files)} sheets")
+    if sheets:
+        print(f"  {size / 1024:.0f} KB total, {size / len(files) / 1024:.0f} KB per sheet")
+        print(f"  {tiles / len(sheets):.1f} tile requests saved per page")
+
+    print(f"\n✓ Wrote {SPRITE_DIR.relative_to(BASE_DIR)}")
+
+
+if __name__ == '__main__':
+    main()
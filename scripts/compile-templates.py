@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Precompile all Jinja templates into the bytecode cache.
+
+Gunicorn workers load compiled templates from TEMPLATE_CACHE_DIR
+(build/jinja/ by default) instead of parsing and compiling
+server/templates on first use after every start or restart.
+
+Usage:
+    python compile-templates.py            # Fill the bytecode cache
+    python compile-templates.py --measure  # Also compare cold vs cached load
+
+With --measure, each template is loaded in a fresh Jinja environment
+twice: once compiled from source (what a worker did before) and once from
+the bytecode cache (what a worker does now). Rendering cost is the same
+either way, so the difference is the first-render saving per template.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from jinja2 import FileSystemBytecodeCache
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from server.app import app
+
+
+# =============================================================================
+# Compilation
+# =============================================================================
+
+def fresh_environment(bytecode_cache):
+    """New Jinja environment configured like the app's, without loaded templates."""
+    env = app.create_jinja_environment()
+    env.add_extension('server.fragments.FragmentCacheExtension')
+    env.bytecode_cache = bytecode_cache
+    return env
+
+
+def compile_all(env):
+    """Load every template once so the bytecode cache is written."""
+    names = sorted(env.list_templates())
+    for name in names:
+        env.get_template(name)
+    return names
+
+
+def time_load(env, name):
+    """Milliseconds to load (and if needed compile) a template."""
+    start = time.perf_counter()
+    env.get_template(name)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(cache_dir, names):
+    """Print cold-compile vs bytecode-cache load time per template."""
+    print(f"\n{'Template':<40} {'Source (ms)':>12} {'Cached (ms)':>12}")
+    print("-" * 66)
+
+    total_cold = total_warm = 0.0
+    for name in names:
+        cold = time_load(fresh_environment(None), name)
+        warm = time_load(fresh_environment(FileSystemBytecodeCache(str(cache_dir))), name)
+        total_cold += cold
+        total_warm += warm
+        print(f"{name:<40} {cold:>12.2f} {warm:>12.2f}")
+
+    print("-" * 66)
+    print(f"{'Total':<40} {total_cold:>12.2f} {total_warm:>12.2f}")
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompile Jinja templates')
+    parser.add_argument('--measure', '-m', action='store_true',
+                        help='Compare first-load time from source and from cache')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("COMPILE TEMPLATES")
+    print("=" * 70)
+
+    cache_dir = app.config['TEMPLATE_CACHE_DIR']
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+    bytecode_cache.clear()
+    names = compile_all(fresh_environment(bytecode_cache))
+
+    print(f"\n✓ Compiled {len(names)} templates into {cache_dir.relative_to(BASE_DIR)}")
+
+    if args.measure:
+        measure(cache_dir, names)
+
+
+if __name__ == '__main__':
+    main()
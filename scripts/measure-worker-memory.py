@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Measure per-worker memory of the gunicorn deployment.
+
+Starts gunicorn twice on a local port - once plainly (each worker builds
+its own menu, manifest and templates) and once with
+config/gunicorn.conf.py (preloaded and frozen in the master) - drives the
+same request mix through both, and reports per-worker USS (unique set
+size: memory no other process shares), PSS and RSS from
+/proc/<pid>/smaps_rollup. Linux only.
+
+Usage:
+    python measure-worker-memory.py
+    python measure-worker-memory.py --workers 2 --requests 400
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+GUNICORN_CONF = BASE_DIR / 'config' / 'gunicorn.conf.py'
+
+# Mix of pages, partials and the precache manifest
+URLS = [
+    '/',
+    '/geologie',
+    '/ziva-priroda',
+    '/chranena-uzemi',
+    '/partials/tiles?parent=geologie',
+    '/partials/menu-sidebar?url=geologie',
+    '/precache-manifest.json',
+]
+
+
+# =============================================================================
+# Process Inspection
+# =============================================================================
+
+def worker_pids(master_pid):
+    """PIDs of the master's child processes."""
+    children = Path(f"/proc/{master_pid}/task/{master_pid}/children").read_text()
+    return [int(pid) for pid in children.split()]
+
+
+def memory_kb(pid):
+    """USS, PSS and RSS of a process in kB."""
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(':', 1)
+        fields[name] = int(value.split()[0])
+    uss = fields['Private_Clean'] + fields['Private_Dirty']
+    return {'uss': uss, 'pss': fields['Pss'], 'rss': fields['Rss']}
+
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+def wait_until_up(base_url, timeout=60):
+    """Poll until gunicorn answers."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/', timeout=2).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"gunicorn did not start at {base_url}")
+
+
+def drive_requests(base_url, count):
+    """Fire `count` requests concurrently so every worker serves some."""
+    def fetch(i):
+        url = base_url + URLS[i % len(URLS)]
+        urllib.request.urlopen(url, timeout=30).read()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(fetch, range(count)))
+
+
+def measure(label, extra_args, workers, port, request_count):
+    """Run gunicorn with the given arguments and report worker memory."""
+    cmd = [
+        sys.executable, '-m', 'gunicorn',
+        '--bind', f"127.0.0.1:{port}",
+        '--workers', str(workers),
+        '--threads', '2',
+        *extra_args,
+        'server.app:app',
+    ]
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url)
+        drive_requests(base_url, request_count)
+        time.sleep(1)
+
+        print(f"\n{label}")
+        print(f"  {'PID':>8} {'USS (MB)':>10} {'PSS (MB)':>10} {'RSS (MB)':>10}")
+        master = memory_kb(proc.pid)
+        print(f"  {'master':>8} {master['uss'] / 1024:>10.1f} "
+              f"{master['pss'] / 1024:>10.1f} {master['rss'] / 1024:>10.1f}")
+
+        total_uss = 0
+        for pid in worker_pids(proc.pid):
+            mem = memory_kb(pid)
+            total_uss += mem['uss']
+            print(f"  {pid:>8} {mem['uss'] / 1024:>10.1f} "
+                  f"{mem['pss'] / 1024:>10.1f} {mem['rss'] / 1024:>10.1f}")
+        print(f"  {'workers':>8} {total_uss / 1024:>10.1f} (total unique)")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare gunicorn worker memory')
+    parser.add_argument('--workers', '-w', type=int, default=2, help='Worker processes')
+    parser.add_argument('--requests', '-n', type=int, default=200, help='Requests per run')
+    parser.add_argument('--port', '-p', type=int, default=5077, help='Local port to use')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("GUNICORN WORKER MEMORY")
+    print("=" * 70)
+
+    measure("Without preload (each worker builds its own state)",
+            [], args.workers, args.port, args.requests)
+    measure("With config/gunicorn.conf.py (preloaded, gc.freeze)",
+            ['--config', str(GUNICORN_CONF)], args.workers, args.port, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,12 @@ Flask application entry point (Czech only)
 
 Uses filesystem-based markdown content from content/ folder.
 """
-from flask import Flask, render_template, request, send_from_directory, abort
+import hashlib
+import mimetypes
+
+from flask import Flask, render_template, request, send_from_directory, abort, jsonify, g, url_for, redirect
+from flask import before_render_template, template_rendered
+from jinja2 import FileSystemBytecodeCache
 from pathlib import Path
 
 # Import content loading functions
@@ -14,25 +19,188 @@ from server.content import (
     get_gallery,
     get_content_image_path,
     get_gallery_image_path,
+    set_backend,
+    paginate_menu,
     CONTENT_DIR
 )
+from server.content_sqlite import SQLiteBackend
+from server.assets import (
+    get_font_manifest,
+    get_bundle_files,
+    find_precompressed,
+    is_fingerprinted,
+    DIST_DIR,
+    STATIC_DIR
+)
+from server.precache import build_precache_manifest
+from server.cache import RenderCache, CachedRender, FragmentCache
+from server.fragments import FragmentCacheExtension
+from server.shared_cache import SharedStore, SharedRenderCache, SharedFragmentCache
+from server.singleflight import SingleFlight
+from server.fastpath import FastPathMiddleware, build_image_index, offload_header
+from server.readahead import ReadAhead
+from server.imagepack import ImagePack
+from server.search import SearchIndex
+from server.facets import FacetIndex, FACETS
+from server.photos import attract_playlist
+from server.sprites import TileSprites, SPRITE_MANIFEST
+from server.placeholders import placeholder_svg
+from server import timing
+from server.compress import (
+    is_compressible,
+    negotiate_encoding,
+    compress,
+    encoded_etag,
+    COMPRESSIBLE_MIMETYPES
+)
 
 app = Flask(__name__)
 
+# Shared cache file of this checkout; several may run side by side
+SHARED_CACHE_NAME = 'priroda-kiosk-{}.cache'.format(
+    hashlib.blake2b(str(Path(__file__).resolve().parent.parent).encode('utf-8'), digest_size=4).hexdigest())
+
 # Configuration
 app.config['INACTIVITY_TIMEOUT'] = 180000  # 3 minutes in milliseconds
+app.config['ATTRACT_INTERVAL'] = 10000  # Attract-mode slide time after inactivity, ms (0: off)
+app.config['ATTRACT_IMAGES'] = 120  # Photos in the attract-mode playlist
 app.config['ITEMS_PER_PAGE'] = 8  # Tiles per page
+app.config['PHOTOS_PER_PAGE'] = 24  # Photos loaded at a time in the photo mosaic
+app.config['OFFLINE_PRECACHE'] = True  # Register service worker (off in debug)
+app.config['USE_BUNDLES'] = True  # Link built CSS/JS bundles when available (off in debug)
+app.config['ASSET_MAX_AGE'] = 31536000  # Fingerprinted assets: 1 year, immutable
+app.config['RENDER_CACHE_BYTES'] = 16 * 1024 * 1024  # Rendered responses per worker (off in debug)
+app.config['FRAGMENT_CACHE_ENTRIES'] = 4096  # Cached template fragments per worker (off in debug)
+app.config['SHARED_CACHE_PATH'] = f'/dev/shm/{SHARED_CACHE_NAME}'  # Cross-worker cache file under gunicorn (None: per worker)
+app.config['SHARED_CACHE_BYTES'] = 32 * 1024 * 1024  # Size of the cross-worker cache file
+app.config['CONTENT_BACKEND'] = 'filesystem'  # Or 'sqlite': read CONTENT_DB_PATH instead of content/
+app.config['CONTENT_DB_PATH'] = Path(__file__).parent.parent / 'build' / 'content.sqlite'  # scripts/build-content-db.py
+app.config['TEMPLATE_CACHE_DIR'] = Path(__file__).parent.parent / 'build' / 'jinja'  # Compiled templates
+app.config['SINGLE_FLIGHT_TIMEOUT'] = 10  # Seconds a duplicate request waits for the first one
+app.config['IMAGE_OFFLOAD'] = None  # 'x-accel-redirect' or 'x-sendfile': front server sends images
+app.config['IMAGE_OFFLOAD_PREFIX'] = '/_content/'  # nginx internal location aliasing content/
+app.config['IMAGE_PACK_PATH'] = Path(__file__).parent.parent / 'build' / 'images.pack'  # Packed content images (None: loose files only)
+app.config['SEARCH_INDEX_PATH'] = Path(__file__).parent.parent / 'build' / 'search.idx'  # scripts/build-search-index.py
+app.config['SEARCH_RESULTS'] = 20  # Results shown per search
+app.config['SEARCH_SUGGESTIONS'] = 8  # Suggestions shown while typing
+app.config['FACET_INDEX_PATH'] = Path(__file__).parent.parent / 'build' / 'facets.idx'  # scripts/build-facet-index.py
+app.config['READAHEAD_QUEUE'] = 256  # Images waiting for page cache read-ahead (0: off)
+app.config['READAHEAD_GALLERY_IMAGES'] = 6  # Gallery images read ahead per rendered page
+app.config['SERVER_TIMING'] = False  # Server-Timing header with per-phase durations (always on in debug)
 
 # Menu cache (rebuilt in debug mode)
 _menu_cache = None
 
+# Precache manifest cache (rebuilt when content version changes)
+_precache_cache = None
+
+# Image URL index for the WSGI fast path (rebuilt when content version changes)
+_image_index_cache = None
+
+# Full-text search index (reloaded when content version changes)
+_search_index_cache = None
+
+# Facet index for browsing across the menu (reloaded when content version changes)
+_facet_index_cache = None
+
+# Attract-mode playlist (rebuilt when content version changes)
+_attract_cache = None
+
+# Tile grid pages per parent (rebuilt when content version changes)
+_tile_pages_cache = None
+
+# Menu nodes with a tile.jpg (rebuilt when content version changes)
+_tile_urls_cache = None
+
+# Tile page sprite sheets, (version, TileSprites or None) (reloaded when content version changes)
+_tile_sprites_cache = None
+
+
+def configure_content_backend():
+    """Install the content backend selected by CONTENT_BACKEND."""
+    if app.config['CONTENT_BACKEND'] != 'sqlite':
+        set_backend(None)
+        return
+    try:
+        set_backend(SQLiteBackend(app.config['CONTENT_DB_PATH']))
+    except OSError as e:
+        app.logger.warning('Content database unavailable (%s), reading content/', e)
+        set_backend(None)
+
+
+configure_content_backend()
+
+
+def create_caches():
+    """Create in-process render and fragment caches (see use_shared_caches)."""
+    return (RenderCache(app.config['RENDER_CACHE_BYTES']),
+            FragmentCache(app.config['FRAGMENT_CACHE_ENTRIES']))
+
+
+# Rendered (and compressed) responses and template fragments ({% cache %}
+# blocks), tagged with the content version
+render_cache, fragment_cache = create_caches()
+
+
+def use_shared_caches():
+    """
+    Move the render and fragment caches into the SHARED_CACHE_PATH file.
+
+    Called by the gunicorn master before warm-up (see
+    config/gunicorn.conf.py), so all workers forked from it share one
+    memory-mapped cache. Any other process importing this module (build
+    scripts, checks, benchmarks, the dev server) keeps in-process caches
+    and never opens the file. The file is emptied: its entries are tagged
+    with the content version only and may come from older templates.
+    """
+    global render_cache, fragment_cache
+    path = app.config['SHARED_CACHE_PATH']
+    if not path:
+        return
+    try:
+        store = SharedStore(path, app.config['SHARED_CACHE_BYTES'])
+    except OSError as e:
+        app.logger.warning('Shared cache unavailable (%s), using per-worker caches', e)
+        return
+    store.reset()
+    render_cache, fragment_cache = SharedRenderCache(store), SharedFragmentCache(store)
+    app.jinja_env.fragment_cache = fragment_cache
+
+
+def reset_caches():
+    """Empty the render and fragment caches."""
+    render_cache.clear()
+    fragment_cache.clear()
+
+
+def reset_cache_stats():
+    """Zero the hit/miss counters, e.g. the master's from warm-up."""
+    render_cache.reset_stats()
+    fragment_cache.reset_stats()
+
+
+# Concurrent identical renders and content loads run once per worker; the
+# duplicates wait for the first one and share its result
+render_flights = SingleFlight(app.config['SINGLE_FLIGHT_TIMEOUT'])
+content_flights = SingleFlight(app.config['SINGLE_FLIGHT_TIMEOUT'])
+
+# Pulls images linked from rendered pages into the page cache
+readahead = ReadAhead(app.config['READAHEAD_QUEUE']) if app.config['READAHEAD_QUEUE'] else None
+
+# Paths that are never rendered by a template, or must never be cached
+UNCACHED_PREFIXES = ('/static/', '/content/', '/_stats/')
+
+# Wrapper for the breadcrumb swapped in alongside HTMX partials
+OOB_BREADCRUMB = '<div id="breadcrumb-container" hx-swap-oob="innerHTML">{}</div>'
+
 
 def get_menu():
     """Load menu structure from filesystem."""
     global _menu_cache
-    if _menu_cache is None or app.debug:
-        _menu_cache = build_menu_tree()
-    return _menu_cache
+    with timing.phase('menu'):
+        if _menu_cache is None or app.debug:
+            _menu_cache = build_menu_tree()
+        return _menu_cache
 
 
 def find_menu_item(items, url):
@@ -75,22 +243,260 @@ def build_breadcrumb(url):
     return breadcrumbs
 
 
+def sibling_urls(menu, url):
+    """Previous and next sibling URLs of a page (precomputed in the menu index)."""
+    item = menu.get('by_url', {}).get(url, {})
+    return {'prev': item.get('prev'), 'next': item.get('next')}
+
+
+def warm_up():
+    """
+    Build all shared state up front.
+
+    Called in the gunicorn master before workers fork (see
+    config/gunicorn.conf.py), so workers share it copy-on-write.
+    """
+    get_menu()
+    get_precache_manifest()
+    get_image_index()
+    get_search_index()
+    get_facet_index()
+    get_tile_urls()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    warm_tile_fragments()
+
+
 @app.context_processor
 def inject_globals():
     """Inject common variables into all templates."""
     return {
         'inactivity_timeout': app.config['INACTIVITY_TIMEOUT'],
+        'attract_interval': app.config['ATTRACT_INTERVAL'],
+        'offline_precache': app.config['OFFLINE_PRECACHE'] and not app.debug,
+        'fonts': get_font_manifest(),
+        'tile_url': tile_url,
+        'bundle_files': lambda bundle: get_bundle_files(
+            bundle, app.config['USE_BUNDLES'] and not app.debug),
         'is_htmx': request.headers.get('HX-Request') == 'true'
     }
 
 
+@app.after_request
+def add_vary_header(response):
+    """Pages and their HTMX partials share URLs; keep caches apart."""
+    if response.mimetype == 'text/html':
+        response.vary.add('HX-Request')
+    return response
+
+
+# =============================================================================
+# Server Timing
+# =============================================================================
+
+def server_timing_enabled():
+    return app.config['SERVER_TIMING'] or app.debug
+
+
+@app.before_request
+def start_server_timing():
+    """Time this request's phases (registered first, so cache lookups count)."""
+    if server_timing_enabled():
+        g.timing_token = timing.start()
+
+
+@app.after_request
+def add_server_timing(response):
+    """Send the phase durations (runs after compression, which it times)."""
+    token = g.pop('timing_token', None)
+    if token is not None:
+        response.headers['Server-Timing'] = timing.finish(token)
+    return response
+
+
+@app.teardown_request
+def stop_server_timing(exc):
+    """Reset timing for requests that ended without a response."""
+    token = g.pop('timing_token', None)
+    if token is not None:
+        timing.finish(token)
+
+
+@before_render_template.connect_via(app)
+def time_template(sender, template, context, **extra):
+    # The breadcrumb's own render counts as breadcrumb time
+    timing.enter('breadcrumb' if template.name == 'partials/breadcrumb-trail.html' else 'template')
+
+
+@template_rendered.connect_via(app)
+def end_template(sender, template, context, **extra):
+    timing.leave()
+
+
+# =============================================================================
+# Render Cache and Compression
+# =============================================================================
+
+def render_cache_key():
+    """Cache key for the current request, or None if it is not cacheable."""
+    if app.debug or request.method != 'GET' or request.path.startswith(UNCACHED_PREFIXES):
+        return None
+    return (request.full_path, bool(request.headers.get('HX-Request')))
+
+
+def replay_render(key, entry):
+    """Response for a cached render."""
+    g.cached_render = entry
+    g.render_cache_key = key
+    return app.response_class(entry.body, status=entry.status, headers=entry.headers)
+
+
+@app.before_request
+def serve_cached_render():
+    """Answer repeated requests straight from the render cache.
+
+    On a miss, the first request renders while concurrent requests for the
+    same key wait for it and replay its render (see finish_render_flight).
+    """
+    key = render_cache_key()
+    if key is None:
+        return None
+
+    entry = render_cache.get(key, get_menu()['version'])
+    timing.hit('render-cache', entry is not None)
+    if entry is not None:
+        return replay_render(key, entry)
+
+    flight, leader = render_flights.begin(key)
+    if leader:
+        g.render_flight = flight
+    elif render_flights.wait(flight) and flight.result is not None:
+        return replay_render(key, flight.result)
+
+    g.render_cache_key = key
+    return None
+
+
+@app.teardown_request
+def finish_render_flight(exc):
+    """Hand the stored render to requests waiting on this one."""
+    flight = g.pop('render_flight', None)
+    if flight is not None:
+        render_flights.finish(g.render_cache_key, flight, result=g.get('stored_render'),
+                              error=exc)
+
+
+@app.after_request
+def compress_response(response):
+    """Store fresh renders and send the encoding the client accepts."""
+    key = g.get('render_cache_key')
+    entry = g.get('cached_render')
+
+    if (entry is None and key is not None and response.status_code == 200
+            and not response.direct_passthrough
+            and response.mimetype in COMPRESSIBLE_MIMETYPES):
+        entry = CachedRender(get_menu()['version'], response.status_code,
+                             list(response.headers.items()), response.get_data())
+        render_cache.set(key, entry)
+        g.stored_render = entry
+
+    if not is_compressible(response):
+        return response
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return response
+
+    with timing.phase('compress'):
+        if entry is not None:
+            body = entry.get_encoded(encoding)
+            if entry.dirty:
+                render_cache.update(key, entry)
+        else:
+            body = compress(response.get_data(), encoding)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # Revalidate against the tag of the variant actually sent
+        response.set_etag(encoded_etag(etag, encoding))
+        response.make_conditional(request)
+    return response
+
+
+def get_fragment_cache_version():
+    """Content version for fragment cache keys; None disables caching."""
+    if app.debug:
+        return None
+    return get_menu()['version']
+
+
+def init_template_cache():
+    """Share compiled templates between workers and restarts via disk."""
+    cache_dir = app.config['TEMPLATE_CACHE_DIR']
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return  # Read-only filesystem (e.g. serverless): compile in memory
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+
+
+init_template_cache()
+app.jinja_env.add_extension(FragmentCacheExtension)
+app.jinja_env.fragment_cache = fragment_cache
+app.jinja_env.fragment_cache_version = get_fragment_cache_version
+
+
+def readahead_page_images(content, gallery):
+    """Start loading the images the browser requests after a page."""
+    if readahead is None:
+        return
+    urls = [f"{content['url']}/tile.jpg"]
+    if gallery:
+        urls += [image['path'] for image in gallery['images'][:app.config['READAHEAD_GALLERY_IMAGES']]]
+    # Only the first tile page is loaded with the page
+    for child in content.get('children', [])[:app.config['ITEMS_PER_PAGE']]:
+        urls.append(f"{child['url']}/tile.jpg")
+
+    index = get_image_index() or {}
+    paths = []
+    for url in urls:
+        entry = index.get(f"/content/{url}")
+        if entry is not None and entry.packed is not None:
+            entry.pack.willneed(entry.packed)
+        else:
+            paths.append(CONTENT_DIR / url)
+    readahead.submit(paths)
+
+
+def render_breadcrumb(breadcrumbs):
+    """
+    Breadcrumb partial, straight from the fragment cache when possible.
+
+    Uses the key partials/breadcrumb.html caches the trail under, so full
+    pages and HTMX partials share entries; only a miss enters the template
+    engine.
+    """
+    with timing.phase('breadcrumb'):
+        key = ('breadcrumb', app.jinja_env.call_filter('tojson', breadcrumbs or []))
+        version = get_fragment_cache_version()
+        if version is None:
+            return render_template('partials/breadcrumb-trail.html', breadcrumbs=breadcrumbs)
+        html = fragment_cache.get(key, version)
+        timing.hit('fragment-cache', html is not None)
+        if html is None:
+            html = render_template('partials/breadcrumb-trail.html', breadcrumbs=breadcrumbs)
+            fragment_cache.set(key, version, html)
+        return html
+
+
 def render_htmx(template, breadcrumbs=None, **context):
     """Render template with OOB breadcrumb update for HTMX requests."""
     content = render_template(template, breadcrumbs=breadcrumbs, **context)
     if breadcrumbs is not None:
-        breadcrumb_html = render_template('partials/breadcrumb.html', breadcrumbs=breadcrumbs)
-        oob = f'<div id="breadcrumb-container" hx-swap-oob="innerHTML">{breadcrumb_html}</div>'
-        return content + oob
+        return content + OOB_BREADCRUMB.format(render_breadcrumb(breadcrumbs))
     return content
 
 
@@ -111,17 +517,50 @@ def home():
 
 @app.route('/mapa')
 def map_view():
-    """Map view of Olomouc region."""
+    """Map view of Olomouc region, with its districts."""
     breadcrumbs = [{'name': 'Mapa', 'url': None}]
+    index = get_facet_index()
+    districts = index.counts(index.all, 'district')
+    for district in districts:
+        district['url'] = url_for('browse_view', district=district['value'])
     if request.headers.get('HX-Request'):
-        return render_htmx('partials/czech-map.html', breadcrumbs=breadcrumbs)
-    return render_template('map.html', breadcrumbs=breadcrumbs)
+        return render_htmx('partials/czech-map.html', breadcrumbs=breadcrumbs, districts=districts)
+    return render_template('map.html', breadcrumbs=breadcrumbs, districts=districts)
+
+
+@app.route('/browse')
+def browse_view():
+    """Pages across the whole menu, narrowed by facets (habitat, district...)."""
+    index = get_facet_index()
+    active = {facet: request.args[facet] for facet in FACETS if request.args.get(facet)}
+    page_num = request.args.get('page', 1, type=int)
+    per_page = app.config['ITEMS_PER_PAGE']
+
+    bits = index.select(**active)
+    total_pages = max(1, (bits.bit_count() + per_page - 1) // per_page)
+    page_num = max(1, min(page_num, total_pages))
+    start_idx = (page_num - 1) * per_page
+    items = index.items(bits, start_idx, start_idx + per_page)
+
+    context = {
+        'items': items,
+        'facets': facet_filters(index, bits, active, 'browse_view'),
+        'photos_url': url_for('photos_view', **active),
+        'page': page_num,
+        'total_pages': total_pages,
+        'prev_url': url_for('browse_view', **active, page=page_num - 1),
+        'next_url': url_for('browse_view', **active, page=page_num + 1),
+    }
+    breadcrumbs = [{'name': 'Procházet', 'url': None}]
+    if request.headers.get('HX-Request'):
+        return render_htmx('partials/browse.html', breadcrumbs=breadcrumbs, **context)
+    return render_template('browse.html', breadcrumbs=breadcrumbs, **context)
 
 
 @app.route('/<path:page_url>')
 def page(page_url):
     """Dynamic page rendering from markdown content."""
-    content = get_page_content(page_url)
+    content = content_flights.do(('page', page_url), get_page_content, page_url)
     menu = get_menu()
 
     if not content:
@@ -145,7 +584,11 @@ def page(page_url):
     # Load gallery if page has one
     gallery = None
     if content.get('gallery'):
-        gallery = get_gallery(page_url)
+        gallery = content_flights.do(('gallery', page_url), get_gallery, page_url)
+
+    readahead_page_images(content, gallery)
+    related = related_items(page_url)
+    siblings = sibling_urls(menu, page_url)
 
     # For HTMX requests, return appropriate partial with OOB breadcrumb
     if request.headers.get('HX-Request'):
@@ -154,15 +597,79 @@ def page(page_url):
                              breadcrumbs=breadcrumbs, content=content)
         elif page_type == 'gallery':
             return render_htmx('partials/gallery-page.html',
-                             breadcrumbs=breadcrumbs, content=content, gallery=gallery)
+                             breadcrumbs=breadcrumbs,
+                             content=content, gallery=gallery)
         else:
             return render_htmx('partials/page-content.html',
-                             breadcrumbs=breadcrumbs, content=content, gallery=gallery)
+                             breadcrumbs=breadcrumbs,
+                             content=content, gallery=gallery, related=related,
+                             siblings=siblings)
 
     # Full page render
     return render_template('page.html',
-                         content=content, gallery=gallery,
-                         breadcrumbs=breadcrumbs)
+                         content=content, gallery=gallery, related=related,
+                         siblings=siblings, breadcrumbs=breadcrumbs)
+
+
+@app.route('/search')
+def search_view():
+    """Full-text search page."""
+    query = request.args.get('q', '').strip()
+    breadcrumbs = [{'name': 'Hledat', 'url': None}]
+    context = {'query': query, 'results': search(query)}
+    if request.headers.get('HX-Request'):
+        return render_htmx('partials/search.html', breadcrumbs=breadcrumbs, **context)
+    return render_template('search.html', breadcrumbs=breadcrumbs, **context)
+
+
+@app.route('/photos')
+def photos_view():
+    """Mosaic of the photos of all galleries, narrowed by facets."""
+    index = get_facet_index()
+    active = {facet: request.args[facet] for facet in FACETS if request.args.get(facet)}
+    bits = index.select(**active)
+    context = dict(photo_page(index, bits, active, 1),
+                   facets=facet_filters(index, bits, active, 'photos_view', index.photos.count),
+                   browse_url=url_for('browse_view', **active),
+                   total=index.photos.count(bits))
+    breadcrumbs = [{'name': 'Fotografie', 'url': None}]
+    if request.headers.get('HX-Request'):
+        return render_htmx('partials/photos.html', breadcrumbs=breadcrumbs, **context)
+    return render_template('photos.html', breadcrumbs=breadcrumbs, **context)
+
+
+def facet_filters(index, bits, active, endpoint, count=int.bit_count):
+    """
+    Facet chips for a selection: each active value (linking to the view
+    without it) and the values of the other facets to narrow by.
+    """
+    facets = []
+    for facet in FACETS:
+        if facet in active:
+            others = {name: value for name, value in active.items() if name != facet}
+            label = index.labels[facet].get(active[facet], active[facet])
+            facets.append({'facet': facet, 'values': [
+                {'label': label, 'count': count(bits), 'url': url_for(endpoint, **others),
+                 'active': True}]})
+        else:
+            values = index.counts(bits, facet, count)
+            for value in values:
+                value['url'] = url_for(endpoint, **active, **{facet: value['value']})
+            if len(values) > 1:
+                facets.append({'facet': facet, 'values': values})
+    return facets
+
+
+def photo_page(index, bits, active, page_num):
+    """Photos of one mosaic page and the URL of the next (None at the end)."""
+    per_page = app.config['PHOTOS_PER_PAGE']
+    start_idx = (max(1, page_num) - 1) * per_page
+    photos = index.photos.slice(bits, start_idx, start_idx + per_page)
+    more = start_idx + per_page < index.photos.count(bits)
+    return {
+        'photos': photos,
+        'next_url': url_for('partial_photos', **active, page=page_num + 1) if more else None,
+    }
 
 
 # =============================================================================
@@ -173,8 +680,7 @@ def page(page_url):
 def partial_breadcrumb():
     """Return breadcrumb partial."""
     url = request.args.get('url', '/')
-    breadcrumbs = build_breadcrumb(url)
-    return render_template('partials/breadcrumb.html', breadcrumbs=breadcrumbs)
+    return render_breadcrumb(build_breadcrumb(url))
 
 
 @app.route('/partials/tiles')
@@ -182,34 +688,17 @@ def partial_tiles():
     """Return tile grid partial with pagination."""
     parent_url = request.args.get('parent', '')
     page_num = request.args.get('page', 1, type=int)
-    per_page = app.config['ITEMS_PER_PAGE']
+    return render_tile_page(parent_url, page_num)
 
-    menu = get_menu()
 
-    if parent_url:
-        parent_item = menu.get('by_url', {}).get(parent_url)
-    else:
-        parent_item = None
-
-    if parent_item:
-        children = parent_item.get('children', [])
-    else:
-        children = menu.get('root', [])
-
-    # Pagination
-    total_items = len(children)
-    total_pages = (total_items + per_page - 1) // per_page
-    start_idx = (page_num - 1) * per_page
-    end_idx = start_idx + per_page
-    items = children[start_idx:end_idx]
-
-    return render_template('partials/tile-grid.html',
-                         items=items,
-                         page=page_num,
-                         total_pages=total_pages,
-                         parent_url=parent_url,
-                         has_more=page_num < total_pages,
-                         has_prev=page_num > 1)
+@app.route('/partials/photos')
+def partial_photos():
+    """Return the next page of the photo mosaic."""
+    index = get_facet_index()
+    active = {facet: request.args[facet] for facet in FACETS if request.args.get(facet)}
+    page_num = request.args.get('page', 1, type=int)
+    return render_template('partials/photo-tiles.html',
+                         **photo_page(index, index.select(**active), active, page_num))
 
 
 @app.route('/partials/gallery')
@@ -218,7 +707,7 @@ def partial_gallery():
     gallery_id = request.args.get('id')  # Now a URL path
     current_idx = request.args.get('index', 0, type=int)
 
-    gallery = get_gallery(gallery_id)
+    gallery = content_flights.do(('gallery', gallery_id), get_gallery, gallery_id)
     if not gallery:
         return '<div class="gallery-error">Galerie nenalezena</div>', 404
 
@@ -250,6 +739,290 @@ def partial_menu_sidebar():
                          current_item=current_item)
 
 
+@app.route('/partials/search-results')
+def partial_search_results():
+    """Return search results for the query typed so far."""
+    query = request.args.get('q', '').strip()
+    return render_template('partials/search-results.html',
+                         query=query, results=search(query))
+
+
+@app.route('/partials/search-suggest')
+def partial_search_suggest():
+    """Return title suggestions for the query typed so far."""
+    query = request.args.get('q', '').strip()
+    suggestions = []
+    if query:
+        suggestions = get_search_index().suggestions.suggest(query, app.config['SEARCH_SUGGESTIONS'], tile_url)
+    return render_template('partials/search-suggest.html', suggestions=suggestions)
+
+
+@app.route('/_stats/cache')
+def cache_stats():
+    """Cache hit rates (per worker for the shared cache) and coalesced work."""
+    return jsonify({
+        'render': render_cache.stats(),
+        'fragment': fragment_cache.stats(),
+        'coalesced': {
+            'render': render_flights.stats(),
+            'content': content_flights.stats(),
+        },
+        'readahead': readahead.stats() if readahead else None,
+    })
+
+
+# =============================================================================
+# Built Static Assets (fingerprinted, precompressed)
+# =============================================================================
+
+@app.route('/static/dist/<path:filename>', defaults={'directory': DIST_DIR})
+@app.route('/static/fonts/<path:filename>', defaults={'directory': STATIC_DIR / 'fonts'})
+def serve_built_asset(filename, directory):
+    """Serve build output, preferring precompressed variants (only fingerprinted files are immutable)."""
+    send_name, encoding = find_precompressed(directory, filename, request.accept_encodings)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = send_from_directory(directory, send_name, mimetype=mimetype,
+                                   max_age=app.config['ASSET_MAX_AGE'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    if is_fingerprinted(filename):
+        response.cache_control.immutable = True
+    else:
+        # Manifests (assets.json, sprites.json) keep their name across builds
+        response.cache_control.max_age = None
+        response.cache_control.no_cache = True
+    return response
+
+
+# =============================================================================
+# Offline Precache (Service Worker)
+# =============================================================================
+
+def get_precache_manifest():
+    """Build precache manifest, cached per content version."""
+    global _precache_cache
+    menu = get_menu()
+    if _precache_cache is None or _precache_cache['version'] != menu['version']:
+        _precache_cache = build_precache_manifest(menu, app.config['ITEMS_PER_PAGE'])
+    return _precache_cache
+
+
+@app.route('/sw.js')
+def service_worker():
+    """Service worker script, tagged with the current content version."""
+    response = app.response_class(
+        render_template('sw.js', version=get_menu()['version']),
+        mimetype='application/javascript'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/precache-manifest.json')
+def precache_manifest():
+    """List of URLs the service worker precaches."""
+    response = jsonify(get_precache_manifest())
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/attract.json')
+def attract_json():
+    """Shuffled photo playlist for the attract-mode slideshow."""
+    global _attract_cache
+    version = get_menu()['version']
+    if _attract_cache is None or _attract_cache['version'] != version:
+        _attract_cache = {
+            'version': version,
+            'images': attract_playlist(get_facet_index().photos, version, app.config['ATTRACT_IMAGES']),
+        }
+    response = jsonify(_attract_cache)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+# =============================================================================
+# Tile Pages
+# =============================================================================
+
+def get_tile_pages():
+    """
+    Tile grid pages of every menu node, cached per content version.
+
+    Returns:
+        {'version': '3f9a0c12be45',
+         'pages': {parent_url: [[item, ...], ...], '': home screen sections}}
+    """
+    global _tile_pages_cache
+    menu = get_menu()
+    if _tile_pages_cache is None or _tile_pages_cache['version'] != menu['version']:
+        _tile_pages_cache = {
+            'version': menu['version'],
+            'pages': paginate_menu(menu, app.config['ITEMS_PER_PAGE']),
+        }
+    return _tile_pages_cache
+
+
+def get_tile_sprites():
+    """Sprite sheets from scripts/build-tile-sprites.py for this content version, or None."""
+    global _tile_sprites_cache
+    version = get_menu()['version']
+    if _tile_sprites_cache is None or _tile_sprites_cache[0] != version:
+        _tile_sprites_cache = (version, TileSprites.load(SPRITE_MANIFEST, version, app.config['ITEMS_PER_PAGE']))
+    return _tile_sprites_cache[1]
+
+
+def get_tile_urls():
+    """URLs of the menu nodes that have a tile image, cached per content version."""
+    global _tile_urls_cache
+    menu = get_menu()
+    if _tile_urls_cache is None or _tile_urls_cache['version'] != menu['version']:
+        _tile_urls_cache = {
+            'version': menu['version'],
+            'urls': frozenset(url for url in menu['by_url'] if get_content_image_path(url, 'tile')),
+        }
+    return _tile_urls_cache['urls']
+
+
+def tile_url(url):
+    """Tile image of a menu node: its tile.jpg, else the SVG placeholder."""
+    # Resolved once per request: in debug mode get_menu() rescans content/
+    tile_urls = g.get('tile_urls')
+    if tile_urls is None:
+        tile_urls = g.tile_urls = get_tile_urls()
+    if url in tile_urls:
+        return f"/content/{url}/tile.jpg"
+    return f"/content/{url}/tile.svg"
+
+
+def render_tile_page(parent_url, page_num):
+    """Tile grid partial for one page (the fragment is cached, see tile-grid.html)."""
+    pages = get_tile_pages()['pages']
+    # Unknown parents show the home screen sections, as before
+    parent_pages = pages[parent_url] if parent_url in pages else pages['']
+    total_pages = len(parent_pages)
+    items = parent_pages[page_num - 1] if 1 <= page_num <= total_pages else []
+    sprites = get_tile_sprites()
+
+    return render_template('partials/tile-grid.html',
+                         items=items,
+                         sprite=sprites.page(parent_url, page_num) if sprites else None,
+                         page=page_num,
+                         total_pages=total_pages,
+                         parent_url=parent_url,
+                         has_more=page_num < total_pages,
+                         has_prev=page_num > 1)
+
+
+def warm_tile_fragments():
+    """Render every tile page into the fragment cache (not in debug mode)."""
+    if get_fragment_cache_version() is None:
+        return
+    with app.test_request_context('/partials/tiles'):
+        for parent_url, parent_pages in get_tile_pages()['pages'].items():
+            for page_num in range(1, len(parent_pages) + 1):
+                render_tile_page(parent_url, page_num)
+
+
+# =============================================================================
+# Search
+# =============================================================================
+
+def get_search_index():
+    """Search index from the content build, else built in memory, per content version."""
+    global _search_index_cache
+    menu = get_menu()
+    if _search_index_cache is None or _search_index_cache.version != menu['version']:
+        index = SearchIndex.load(app.config['SEARCH_INDEX_PATH'], menu['version'])
+        if index is None:
+            app.logger.info('Search index missing or outdated, building it in memory')
+            index = SearchIndex.build(menu)
+        _search_index_cache = index
+    return _search_index_cache
+
+
+def search(query):
+    """Top search results for a query ([] for an empty query)."""
+    if not query:
+        return []
+    return get_search_index().search(query, app.config['SEARCH_RESULTS'], tile_url)
+
+
+def related_items(page_url):
+    """Menu items of the pages related to a page (precomputed with the search index)."""
+    by_url = get_menu()['by_url']
+    return [by_url[url] for url in get_search_index().related.get(page_url, ()) if url in by_url]
+
+
+# =============================================================================
+# Facets
+# =============================================================================
+
+def get_facet_index():
+    """Facet index from the content build, else built from the menu, per content version."""
+    global _facet_index_cache
+    menu = get_menu()
+    if _facet_index_cache is None or _facet_index_cache.version != menu['version']:
+        index = FacetIndex.load(app.config['FACET_INDEX_PATH'], menu['version'])
+        if index is None:
+            # Reading every photo's size opens each gallery image; that is
+            # the content build's job, not the server's
+            app.logger.error('Facet index %s missing or outdated, run scripts/build-facet-index.py '
+                             '(photo sizes and the attract playlist are empty until then)',
+                             app.config['FACET_INDEX_PATH'])
+            index = FacetIndex.build(menu, read_sizes=False)
+        _facet_index_cache = index
+    return _facet_index_cache
+
+
+# =============================================================================
+# Content Image Fast Path
+# =============================================================================
+
+def get_image_index():
+    """Image URL index, cached per content version; None in debug mode."""
+    global _image_index_cache
+    if app.debug:
+        return None
+    version = get_menu()['version']
+    if _image_index_cache is None or _image_index_cache[0] != version:
+        pack_path = app.config['IMAGE_PACK_PATH']
+        pack = ImagePack.open(pack_path) if pack_path else None
+        _image_index_cache = (version, build_image_index(
+            CONTENT_DIR, app.config['IMAGE_OFFLOAD'], app.config['IMAGE_OFFLOAD_PREFIX'], pack))
+    return _image_index_cache[1]
+
+
+# Tile and gallery images are served before Flask routing; the routes
+# below handle whatever the index does not cover
+app.wsgi_app = FastPathMiddleware(app.wsgi_app, get_image_index)
+
+
+def send_content_image(img_path):
+    """Send a content image, or let the front server send it when offloading."""
+    if not img_path.resolve().is_relative_to(CONTENT_DIR.resolve()):
+        abort(404)
+    offload = app.config['IMAGE_OFFLOAD']
+    if offload and not app.debug:
+        name, value = offload_header(offload, img_path, CONTENT_DIR, app.config['IMAGE_OFFLOAD_PREFIX'])
+        response = app.response_class(mimetype='image/jpeg')
+        response.headers[name] = value
+        return response
+    return send_from_directory(img_path.parent, img_path.name)
+
+
+def send_placeholder_tile(url):
+    """SVG placeholder with the node title, for menu nodes without a tile image."""
+    item = get_menu()['by_url'].get(url.strip('/'))
+    if item is None:
+        abort(404)
+    response = app.response_class(placeholder_svg(item['name']), mimetype='image/svg+xml')
+    response.add_etag()
+    return response.make_conditional(request)
+
+
 # =============================================================================
 # Content Image Routes (new filesystem structure)
 # =============================================================================
@@ -260,17 +1033,24 @@ def serve_header_image(url):
     # Header images consolidated into tile.jpg
     img_path = get_content_image_path(url, 'tile')
     if img_path:
-        return send_from_directory(img_path.parent, img_path.name)
-    abort(404)
+        return send_content_image(img_path)
+    return redirect(f"/content/{url}/tile.svg")
 
 
 @app.route('/content/<path:url>/tile.jpg')
 def serve_tile_image(url):
-    """Serve tile image from content directory."""
+    """Serve tile image from content directory (the placeholder if there is none)."""
     img_path = get_content_image_path(url, 'tile')
     if img_path:
-        return send_from_directory(img_path.parent, img_path.name)
-    abort(404)
+        return send_content_image(img_path)
+    # Templates link the placeholder directly (see tile_url)
+    return redirect(f"/content/{url}/tile.svg")
+
+
+@app.route('/content/<path:url>/tile.svg')
+def serve_placeholder_tile(url):
+    """Serve the placeholder tile of a menu node."""
+    return send_placeholder_tile(url)
 
 
 @app.route('/content/<path:url>/gallery/<filename>')
@@ -278,7 +1058,7 @@ def serve_gallery_image(url, filename):
     """Serve gallery images from content directory."""
     img_path = get_gallery_image_path(url, filename)
     if img_path:
-        return send_from_directory(img_path.parent, img_path.name)
+        return send_content_image(img_path)
     abort(404)
 
 
@@ -0,0 +1,132 @@
+"""
+Build-time static asset manifests.
+
+Build scripts under scripts/ write small JSON manifests into server/static
+that describe generated, fingerprinted files. This module loads them once
+and exposes them to the templates. A missing manifest (build step not run)
+is not an error; templates fall back to the unbuilt source files and
+system fonts.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+STATIC_DIR = Path(__file__).parent / 'static'
+DIST_DIR = STATIC_DIR / 'dist'
+FONT_MANIFEST = STATIC_DIR / 'fonts' / 'fonts.json'
+ASSET_MANIFEST = DIST_DIR / 'assets.json'
+
+# CSS/JS bundles built by scripts/build-assets.py. Each bundle lists the
+# source files (relative to server/static) in load order; unbundled pages
+# link the same files individually. CSS @import rules are inlined.
+BUNDLES = {
+    'kiosk.css': ['css/kiosk.css', 'css/touch.css'],
+    'kiosk.js': ['js/htmx.min.js', 'js/htmx-config.js', 'js/kiosk.js', 'js/attract.js', 'js/swipe.js', 'js/search.js'],
+}
+
+# Precompressed variants written next to each bundle, in preference order
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]
+
+# Content hash in a built file name: kiosk.515405016b.css,
+# open-sans-400-normal.1f0e3c2a9b.woff2, sprites/05853be4795d.jpg
+FINGERPRINT = re.compile(r'(?:^|[./])[0-9a-f]{10,}\.\w+$')
+
+# Loaded manifests (read once per process)
+_font_manifest = None
+_asset_manifest = None
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    """Load a JSON manifest, returning {} if it does not exist."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# =============================================================================
+# Fonts
+# =============================================================================
+
+def get_font_manifest() -> Dict[str, Any]:
+    """
+    Load the web font manifest written by scripts/build-fonts.py.
+
+    Returns:
+        {
+            'unicode_range': 'U+0020-007E, ...',
+            'faces': [
+                {'family': 'Open Sans', 'weight': 400, 'style': 'normal',
+                 'file': 'fonts/open-sans-400-normal.1a2b3c4d5e.woff2',
+                 'preload': True},
+                ...
+            ]
+        }
+    """
+    global _font_manifest
+    if _font_manifest is None:
+        _font_manifest = _load_json(FONT_MANIFEST) or {'unicode_range': '', 'faces': []}
+    return _font_manifest
+
+
+# =============================================================================
+# CSS/JS Bundles
+# =============================================================================
+
+def get_asset_manifest() -> Dict[str, Any]:
+    """
+    Load the bundle manifest written by scripts/build-assets.py.
+
+    Returns:
+        {
+            'kiosk.css': {'file': 'dist/kiosk.1a2b3c4d5e.css', 'sources': [...]},
+            'kiosk.js': {'file': 'dist/kiosk.6f7a8b9c0d.js', 'sources': [...]}
+        }
+    """
+    global _asset_manifest
+    if _asset_manifest is None:
+        _asset_manifest = _load_json(ASSET_MANIFEST)
+    return _asset_manifest
+
+
+def get_bundle_files(bundle: str, use_bundles: bool = True) -> List[str]:
+    """
+    Get static file names to link for a bundle.
+
+    Args:
+        bundle: Bundle name from BUNDLES (e.g. 'kiosk.css')
+        use_bundles: False to always link the individual source files
+
+    Returns:
+        ['dist/kiosk.1a2b3c4d5e.css'] when built, else the source files
+    """
+    entry = get_asset_manifest().get(bundle) if use_bundles else None
+    if entry:
+        return [entry['file']]
+    return BUNDLES[bundle]
+
+
+def is_fingerprinted(filename: str) -> bool:
+    """Whether a built file name carries a content hash (safe to cache forever)."""
+    return FINGERPRINT.search(filename) is not None
+
+
+def find_precompressed(directory: Path, filename: str, accept_encodings) -> Tuple[str, Optional[str]]:
+    """
+    Pick the best precompressed variant of a static file.
+
+    Args:
+        directory: Directory holding the file and its .br/.gz siblings
+        filename: Requested file name
+        accept_encodings: Werkzeug Accept object from request.accept_encodings
+
+    Returns:
+        (file name to send, Content-Encoding or None for identity)
+    """
+    for encoding, suffix in PRECOMPRESSED:
+        if accept_encodings[encoding] and (directory / f"{filename}{suffix}").is_file():
+            return f"{filename}{suffix}", encoding
+    return filename, None
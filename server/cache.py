@@ -0,0 +1,198 @@
+"""
+In-process caches of rendered responses and template fragments.
+
+Rendered pages and partials depend only on the request URL, the HX-Request
+header and the content tree, so each entry is tagged with the content
+version and dropped once the content changes. Response entries also hold
+the compressed variants of their body, so every unique response is
+rendered and compressed at most once per worker.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, List, Tuple, Any
+
+from server.compress import compress
+
+# Headers that are recomputed for every response and never replayed
+_SKIP_HEADERS = {'content-length', 'content-encoding', 'date'}
+
+
+class CachedRender:
+    """A rendered response body plus its lazily built encoded variants."""
+
+    def __init__(self, version: str, status: int, headers: List[Tuple[str, str]], body: bytes):
+        self.version = version
+        self.status = status
+        self.headers = [(k, v) for k, v in headers if k.lower() not in _SKIP_HEADERS]
+        self.body = body
+        self.encoded: Dict[str, bytes] = {}
+        self.dirty = False  # Encoded variants added since the entry was stored
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Bytes held by this entry (identity plus encoded bodies)."""
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+    def get_encoded(self, encoding: str) -> bytes:
+        """Return the body compressed with `encoding`, compressing only once."""
+        data = self.encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self.encoded.get(encoding)
+                if data is None:
+                    data = compress(self.body, encoding)
+                    self.encoded[encoding] = data
+                    self.dirty = True
+        return data
+
+
+class RenderCache:
+    """
+    Thread-safe LRU cache of CachedRender entries, bounded by total bytes.
+
+    Usage:
+        cache = RenderCache(max_bytes=16 * 1024 * 1024)
+        entry = cache.get(key, version)
+        if entry is None:
+            cache.set(key, CachedRender(version, 200, headers, body))
+
+    See server/shared_cache.py for a backend with the same interface that
+    is shared between worker processes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Any, CachedRender]' = OrderedDict()
+        self._sizes: Dict[Any, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version: str) -> Optional[CachedRender]:
+        """Look up an entry; entries from another content version miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry: CachedRender):
+        """Store an entry, evicting least recently used ones over the limit."""
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = entry
+            self._sizes[key] = entry.size
+            self._total += entry.size
+            self._evict()
+
+    def update(self, key, entry: CachedRender):
+        """Re-account an entry after encoded variants were added to it."""
+        with self._lock:
+            entry.dirty = False
+            if self._entries.get(key) is not entry:
+                return
+            self._total += entry.size - self._sizes[key]
+            self._sizes[key] = entry.size
+            self._evict()
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total = 0
+
+    def reset_stats(self):
+        """Zero the hit/miss counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory use."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _discard(self, key):
+        if key in self._entries:
+            del self._entries[key]
+            self._total -= self._sizes.pop(key)
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._entries:
+            key, _ = self._entries.popitem(last=False)
+            self._total -= self._sizes.pop(key)
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU cache of rendered template fragments.
+
+    Keys are tuples such as ('breadcrumb', 'geologie/kras'); values are the
+    rendered markup. All entries belong to one content version and the
+    cache empties itself when a different version is requested.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, str]' = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, version: str) -> Optional[str]:
+        """Look up a fragment rendered for `version`."""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Tuple, version: str, value: str):
+        """Store a fragment; ignored if the content version moved on."""
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all fragments."""
+        with self._lock:
+            self._entries.clear()
+
+    def reset_stats(self):
+        """Zero the hit/miss counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,78 @@
+"""
+HTTP response compression helpers.
+
+gzip is always available; brotli is used when the optional `brotli`
+package is installed. Bodies are compressed once and the encoded bytes
+are kept with the cached render (see server/cache.py).
+"""
+
+import gzip
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent as-is; headers would eat the savings
+MIN_SIZE = 512
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 8
+
+# A strong ETag names one exact body, so each encoded variant gets its own
+ETAG_SUFFIXES = {'br': '-br', 'gzip': '-gz'}
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'image/svg+xml',
+}
+
+
+def supported_encodings():
+    """Encodings this server can produce, in preference order."""
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """
+    Pick the response encoding from the request's Accept-Encoding.
+
+    Args:
+        accept_encodings: Werkzeug Accept object from request.accept_encodings
+
+    Returns:
+        'br', 'gzip' or None for identity
+    """
+    for encoding in supported_encodings():
+        if accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def is_compressible(response) -> bool:
+    """Check whether a Flask response body should be compressed."""
+    return (
+        not response.direct_passthrough
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and 'Content-Encoding' not in response.headers
+        and (response.content_length or 0) >= MIN_SIZE
+    )
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Strong ETag (unquoted) of the `encoding` variant of a body."""
+    return etag + ETAG_SUFFIXES[encoding]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with the given content encoding."""
+    if encoding == 'br':
+        return brotli.compress(body, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
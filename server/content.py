@@ -7,14 +7,21 @@ markdown content. All content is stored in the content/ folder with:
 - page.md for leaf pages
 - Co-located tile.jpg and header.jpg images
 - gallery/ subfolder with images and sidecar .md files
+
+The same content can also be compiled into another store and read from
+there at runtime (see ContentBackend and server/content_sqlite.py).
 """
 
+import hashlib
+from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional, Dict, List, Any
 import yaml
 import frontmatter
 import markdown
 
+from server import timing
+
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -24,6 +31,59 @@ CONTENT_DIR = Path(__file__).parent.parent / 'content'
 # Markdown processor with common extensions
 _md = markdown.Markdown(extensions=['tables', 'fenced_code', 'nl2br'])
 
+# Content store used instead of the filesystem (None: read content/)
+_backend = None
+
+
+# =============================================================================
+# Content Backends
+# =============================================================================
+
+class ContentBackend(ABC):
+    """
+    Interface of a content store compiled from the content/ tree.
+
+    Once installed with set_backend(), the public functions of this module
+    delegate to it. Each method returns the same structure as the function
+    of the same name reading the filesystem; a backend missing one cannot
+    be instantiated.
+    """
+
+    @abstractmethod
+    def get_content_version(self) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def build_menu_tree(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_page_content(self, url: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_gallery(self, url: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_content_image_path(self, url: str, image_type: str) -> Optional[Path]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_gallery_image_path(self, url: str, filename: str) -> Optional[Path]:
+        raise NotImplementedError
+
+
+def set_backend(backend: Optional[ContentBackend]):
+    """Read content from `backend`, or from the filesystem when None."""
+    global _backend
+    _backend = backend
+
+
+def get_backend() -> Optional[ContentBackend]:
+    """The installed content backend (None: filesystem)."""
+    return _backend
+
 
 # =============================================================================
 # Low-level Utilities
@@ -41,9 +101,11 @@ def _load_frontmatter(md_file: Path) -> Dict[str, Any]:
 def _load_markdown_file(md_file: Path) -> Dict[str, Any]:
     """Load a markdown file and return metadata + HTML content."""
     try:
-        post = frontmatter.load(md_file)
-        html_content = _md.convert(post.content)
-        _md.reset()
+        with timing.phase('frontmatter'):
+            post = frontmatter.load(md_file)
+        with timing.phase('markdown'):
+            html_content = _md.convert(post.content)
+            _md.reset()
         return {
             'metadata': dict(post.metadata),
             'content': html_content
@@ -52,7 +114,13 @@ def _load_markdown_file(md_file: Path) -> Dict[str, Any]:
         return {'metadata': {}, 'content': ''}
 
 
-def _get_dir_title(dir_path: Path) -> str:
+def get_file_revision(path: Path) -> str:
+    """Get a cheap revision tag for a file from its size and mtime."""
+    st = path.stat()
+    return f"{st.st_size:x}-{int(st.st_mtime):x}"
+
+
+def get_dir_title(dir_path: Path) -> str:
     """Get title from directory's markdown file or derive from name."""
     for filename in ['_index.md', 'page.md']:
         md_file = dir_path / filename
@@ -64,6 +132,32 @@ def _get_dir_title(dir_path: Path) -> str:
     return dir_path.name.replace('-', ' ').title()
 
 
+# =============================================================================
+# Content Version
+# =============================================================================
+
+def get_content_version() -> str:
+    """
+    Compute a short hash identifying the current state of the content tree.
+
+    The hash covers the relative path, size and mtime of every file under
+    CONTENT_DIR, so any added, removed or edited file changes the version.
+    File contents are not read; a full scan stats ~2,300 files.
+
+    Returns:
+        12-character hex digest, e.g. '3f9a0c12be45'
+    """
+    if _backend is not None:
+        return _backend.get_content_version()
+
+    digest = hashlib.sha1()
+    for path in sorted(CONTENT_DIR.rglob('*')):
+        if path.is_file():
+            rel = path.relative_to(CONTENT_DIR).as_posix()
+            digest.update(f"{rel}:{get_file_revision(path)}\n".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
 # =============================================================================
 # Menu Loading
 # =============================================================================
@@ -79,7 +173,7 @@ def load_menu_yaml() -> Dict[str, Any]:
 
 def _build_menu_item(dir_path: Path, url_path: str) -> Dict[str, Any]:
     """Recursively build menu item from directory."""
-    title = _get_dir_title(dir_path)
+    title = get_dir_title(dir_path)
 
     item = {
         'id': url_path.replace('/', '-'),
@@ -102,8 +196,12 @@ def _build_menu_item(dir_path: Path, url_path: str) -> Dict[str, Any]:
 def _index_menu_item(item: Dict, by_url: Dict):
     """Index menu item and its children by URL."""
     by_url[item['url']] = item
-    for child in item.get('children', []):
+    children = item.get('children', [])
+    for position, child in enumerate(children):
         child['parent'] = item  # Add parent reference
+        # Sibling URLs for swipe navigation (None at either end)
+        child['prev'] = children[position - 1]['url'] if position > 0 else None
+        child['next'] = children[position + 1]['url'] if position + 1 < len(children) else None
         _index_menu_item(child, by_url)
 
 
@@ -117,9 +215,13 @@ def build_menu_tree() -> Dict[str, Any]:
                 {'id': 3, 'name': 'Geologie', 'url': 'geologie', 'children': [...]},
                 ...
             ],
-            'by_url': {'geologie': {...}, 'geologie/kras': {...}, ...}
+            'by_url': {'geologie': {...}, 'geologie/kras': {...}, ...},
+            'version': '3f9a0c12be45'
         }
     """
+    if _backend is not None:
+        return _backend.build_menu_tree()
+
     menu_yaml = load_menu_yaml()
     root_items = []
     by_url = {}
@@ -135,7 +237,21 @@ def build_menu_tree() -> Dict[str, Any]:
             root_items.append(item)
             _index_menu_item(item, by_url)
 
-    return {'root': root_items, 'by_url': by_url}
+    return {'root': root_items, 'by_url': by_url, 'version': get_content_version()}
+
+
+def paginate_menu(menu: Dict[str, Any], per_page: int) -> Dict[str, List[List[Dict]]]:
+    """
+    Split the children of every menu node into tile grid pages.
+
+    Returns:
+        {parent_url: [[item, ...], ...]}, with '' for the top-level sections
+        and an empty list for nodes without children
+    """
+    parents = {'': menu['root']}
+    parents.update((url, item['children']) for url, item in menu['by_url'].items())
+    return {url: [children[start:start + per_page] for start in range(0, len(children), per_page)]
+            for url, children in parents.items()}
 
 
 # =============================================================================
@@ -160,6 +276,14 @@ def get_page_content(url: str) -> Optional[Dict[str, Any]]:
             'children': [...]
         }
     """
+    with timing.phase('content'):
+        if _backend is not None:
+            return _backend.get_page_content(url)
+        return _load_page_content(url)
+
+
+def _load_page_content(url: str) -> Optional[Dict[str, Any]]:
+    """get_page_content() from the filesystem."""
     url = url.strip('/')
     content_path = CONTENT_DIR / url
 
@@ -207,7 +331,7 @@ def get_page_content(url: str) -> Optional[Dict[str, Any]]:
     for child_dir in sorted(content_path.iterdir()):
         if child_dir.is_dir() and child_dir.name != 'gallery':
             child_url = f"{url}/{child_dir.name}"
-            child_title = _get_dir_title(child_dir)
+            child_title = get_dir_title(child_dir)
             children.append({
                 'id': child_dir.name,
                 'name': child_title,
@@ -253,6 +377,14 @@ def get_gallery(url: str) -> Optional[Dict[str, Any]]:
             ]
         }
     """
+    with timing.phase('gallery'):
+        if _backend is not None:
+            return _backend.get_gallery(url)
+        return _load_gallery(url)
+
+
+def _load_gallery(url: str) -> Optional[Dict[str, Any]]:
+    """get_gallery() from the filesystem."""
     url = url.strip('/')
     gallery_path = CONTENT_DIR / url / 'gallery'
 
@@ -281,7 +413,8 @@ def get_gallery(url: str) -> Optional[Dict[str, Any]]:
         author = ''
 
         if sidecar_file.exists():
-            post = frontmatter.load(sidecar_file)
+            with timing.phase('frontmatter'):
+                post = frontmatter.load(sidecar_file)
             # Author might be in frontmatter
             author = post.get('author', '')
 
@@ -329,6 +462,9 @@ def get_content_image_path(url: str, image_type: str) -> Optional[Path]:
     Returns:
         Path object or None if not found
     """
+    if _backend is not None:
+        return _backend.get_content_image_path(url, image_type)
+
     url = url.strip('/')
     content_path = CONTENT_DIR / url
 
@@ -353,6 +489,9 @@ def get_gallery_image_path(url: str, filename: str) -> Optional[Path]:
     Returns:
         Path object or None if not found
     """
+    if _backend is not None:
+        return _backend.get_gallery_image_path(url, filename)
+
     url = url.strip('/')
     img_path = CONTENT_DIR / url / 'gallery' / filename
     return img_path if img_path.exists() else None
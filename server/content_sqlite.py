@@ -0,0 +1,301 @@
+"""
+SQLite content backend.
+
+Editors keep working on the content/ markdown tree; scripts/build-content-db.py
+compiles it into one SQLite database with pre-rendered page HTML, which
+the server can read instead of crawling and parsing content/ at runtime
+(CONTENT_BACKEND = 'sqlite' in server/app.py).
+
+Tables:
+
+    meta            key/value: content version, menu.yaml sections
+    nodes           one row per content directory: url, parent, position, name
+    pages           title, pre-rendered HTML, type and gallery flag per node
+    gallery_images  gallery images per node in display order, with captions
+    assets          files the image routes serve (tiles, gallery files)
+
+The database is a snapshot: it carries the content version it was compiled
+from and has to be rebuilt after editing content/.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from server.content import (
+    ContentBackend,
+    CONTENT_DIR,
+    get_backend,
+    get_content_version,
+    get_dir_title,
+    get_gallery,
+    get_page_content,
+    load_menu_yaml,
+)
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE nodes (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    parent_id INTEGER REFERENCES nodes(id),
+    position INTEGER NOT NULL,
+    slug TEXT NOT NULL,
+    name TEXT NOT NULL,
+    has_gallery INTEGER NOT NULL
+);
+CREATE INDEX nodes_parent ON nodes(parent_id, position);
+CREATE TABLE pages (
+    node_id INTEGER PRIMARY KEY REFERENCES nodes(id),
+    title TEXT NOT NULL,
+    html TEXT NOT NULL,
+    type TEXT,
+    gallery INTEGER NOT NULL
+);
+CREATE TABLE gallery_images (
+    node_id INTEGER NOT NULL REFERENCES nodes(id),
+    position INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    caption TEXT NOT NULL,
+    author TEXT NOT NULL,
+    PRIMARY KEY (node_id, position)
+);
+CREATE TABLE assets (
+    path TEXT PRIMARY KEY,
+    node_id INTEGER NOT NULL REFERENCES nodes(id),
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+# =============================================================================
+# Compilation
+# =============================================================================
+
+def compile_database(db_path: Path, content_dir: Path = CONTENT_DIR) -> int:
+    """
+    Compile the content/ tree into a new database at db_path.
+
+    Reads through the filesystem functions of server/content.py, so the
+    database holds exactly what they return. Written next to db_path and
+    renamed into place, so running servers keep their open snapshot.
+
+    Returns:
+        Number of nodes written
+    """
+    if get_backend() is not None:
+        raise RuntimeError("compile_database() reads the filesystem; unset the content backend first")
+
+    tmp_path = db_path.with_name(db_path.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;")
+        conn.executescript(SCHEMA)
+
+        sections = [
+            [section.get('id', ''), section.get('title')]
+            for section in load_menu_yaml().get('sections', [])
+            if (content_dir / section.get('id', '')).is_dir()
+        ]
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ('version', get_content_version()),
+            ('menu', json.dumps(sections, ensure_ascii=False)),
+        ])
+
+        count = 0
+        pending = [(child, None, position) for position, child in enumerate(_child_dirs(content_dir))]
+        while pending:
+            dir_path, parent_id, position = pending.pop()
+            node_id = _insert_node(conn, content_dir, dir_path, parent_id, position)
+            count += 1
+            pending.extend((child, node_id, position) for position, child in enumerate(_child_dirs(dir_path)))
+
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return count
+
+
+def _child_dirs(dir_path: Path):
+    """Content subdirectories in menu order."""
+    return [d for d in sorted(dir_path.iterdir()) if d.is_dir() and d.name != 'gallery']
+
+
+def _insert_node(conn, content_dir: Path, dir_path: Path, parent_id: Optional[int], position: int) -> int:
+    """Insert one directory with its page, gallery and image files."""
+    url = dir_path.relative_to(content_dir).as_posix()
+    gallery_dir = dir_path / 'gallery'
+
+    cursor = conn.execute(
+        "INSERT INTO nodes (url, parent_id, position, slug, name, has_gallery) VALUES (?, ?, ?, ?, ?, ?)",
+        (url, parent_id, position, dir_path.name, get_dir_title(dir_path), gallery_dir.is_dir()))
+    node_id = cursor.lastrowid
+
+    page = get_page_content(url)
+    conn.execute("INSERT INTO pages VALUES (?, ?, ?, ?, ?)",
+                 (node_id, page['title'], page['content'], page['type'], bool(page['gallery'])))
+
+    files = [dir_path / name for name in ('tile.jpg', 'header.jpg')]
+    if gallery_dir.is_dir():
+        gallery = get_gallery(url)
+        conn.executemany("INSERT INTO gallery_images VALUES (?, ?, ?, ?, ?)", [
+            (node_id, position, image['path'].rsplit('/', 1)[1], image['caption'], image['author'])
+            for position, image in enumerate(gallery['images'])
+        ])
+        files += sorted(gallery_dir.iterdir())
+
+    for path in files:
+        if path.is_file():
+            st = path.stat()
+            conn.execute("INSERT INTO assets VALUES (?, ?, ?, ?)",
+                         (path.relative_to(content_dir).as_posix(), node_id, st.st_size, st.st_mtime_ns))
+
+    return node_id
+
+
+# =============================================================================
+# Backend
+# =============================================================================
+
+class SQLiteBackend(ContentBackend):
+    """
+    Content backend reading a database written by compile_database().
+
+    Usage:
+        set_backend(SQLiteBackend('build/content.sqlite'))
+    """
+
+    def __init__(self, db_path: Path, content_dir: Path = CONTENT_DIR):
+        self.db_path = Path(db_path)
+        self.content_dir = content_dir
+        if not self.db_path.is_file():
+            raise FileNotFoundError(f"Content database not found: {self.db_path}")
+        self._local = threading.local()
+        self._version = None
+
+    def _conn(self) -> sqlite3.Connection:
+        """Read-only connection for this thread (and process)."""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True,
+                                         check_same_thread=False)
+            local.pid = os.getpid()
+        return local.conn
+
+    def _meta(self, key: str) -> str:
+        return self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def get_content_version(self) -> str:
+        if self._version is None:
+            self._version = self._meta('version')
+        return self._version
+
+    def build_menu_tree(self) -> Dict[str, Any]:
+        items = {}
+        children = {}
+        rows = self._conn().execute(
+            "SELECT id, parent_id, url, name FROM nodes ORDER BY parent_id, position")
+        for node_id, parent_id, url, name in rows:
+            item = {'id': url.replace('/', '-'), 'name': name, 'url': url, 'children': []}
+            items[url] = item
+            children.setdefault(parent_id, []).append((node_id, item))
+
+        def attach(node_id, item):
+            for child_id, child in children.get(node_id, ()):
+                item['children'].append(child)
+                attach(child_id, child)
+
+        for node_id, item in children.get(None, ()):
+            attach(node_id, item)
+
+        root_items = []
+        by_url = {}
+        for section_id, title in json.loads(self._meta('menu')):
+            item = items[section_id]
+            item['name'] = title or item['name']
+            root_items.append(item)
+            _index(item, by_url)
+
+        return {'root': root_items, 'by_url': by_url, 'version': self.get_content_version()}
+
+    def get_page_content(self, url: str) -> Optional[Dict[str, Any]]:
+        url = url.strip('/')
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT n.id, p.title, p.html, p.type, p.gallery FROM nodes n "
+            "JOIN pages p ON p.node_id = n.id WHERE n.url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+
+        node_id, title, html, page_type, gallery = row
+        content = {
+            'id': url.replace('/', '-'),
+            'title': title,
+            'content': html,
+            'url': url,
+            'type': page_type,
+            'gallery': bool(gallery)
+        }
+        children = [
+            {'id': slug, 'name': name, 'url': child_url}
+            for slug, name, child_url in conn.execute(
+                "SELECT slug, name, url FROM nodes WHERE parent_id = ? ORDER BY position", (node_id,))
+        ]
+        if children:
+            content['children'] = children
+        return content
+
+    def get_gallery(self, url: str) -> Optional[Dict[str, Any]]:
+        url = url.strip('/')
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT n.id, p.title FROM nodes n JOIN pages p ON p.node_id = n.id "
+            "WHERE n.url = ? AND n.has_gallery", (url,)).fetchone()
+        if row is None:
+            return None
+
+        node_id, title = row
+        images = []
+        for filename, caption, author in conn.execute(
+                "SELECT filename, caption, author FROM gallery_images WHERE node_id = ? ORDER BY position",
+                (node_id,)):
+            rel_path = f"{url}/gallery/{filename}"
+            images.append({'path': rel_path, 'thumb': rel_path, 'caption': caption, 'author': author})
+
+        return {'id': url, 'name': title, 'images': images}
+
+    def _asset_path(self, rel_path: str) -> Optional[Path]:
+        row = self._conn().execute("SELECT 1 FROM assets WHERE path = ?", (rel_path,)).fetchone()
+        return self.content_dir / rel_path if row else None
+
+    def get_content_image_path(self, url: str, image_type: str) -> Optional[Path]:
+        if image_type not in ('header', 'tile'):
+            return None
+        return self._asset_path(f"{url.strip('/')}/{image_type}.jpg")
+
+    def get_gallery_image_path(self, url: str, filename: str) -> Optional[Path]:
+        return self._asset_path(f"{url.strip('/')}/gallery/{filename}")
+
+
+def _index(item: Dict, by_url: Dict):
+    """Index a menu item and its children by URL, adding parent and sibling references."""
+    by_url[item['url']] = item
+    children = item['children']
+    for position, child in enumerate(children):
+        child['parent'] = item
+        child['prev'] = children[position - 1]['url'] if position > 0 else None
+        child['next'] = children[position + 1]['url'] if position + 1 < len(children) else None
+        _index(child, by_url)
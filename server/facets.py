@@ -0,0 +1,210 @@
+"""
+Facet index over the content path hierarchy.
+
+Content paths encode more than the menu shows: the habitat and organism
+group of a species (ziva-priroda/<habitat>/<group>/...), the district of
+a locality (okres-* at any depth) and the kind of locality (the category
+below geologie and chranena-uzemi). The facet index lists, for each facet
+value, the pages below that directory as a bitset (a Python int, bit n
+for page n), so cross-cutting views are intersections:
+
+    index.select(group='zivocichove')                  # all animals
+    index.select(district='okres-prerov', category='kras-olomouckeho-kraje')
+
+Pages are numbered in name order, so a bitset's pages come out sorted.
+The photo index (server/photos.py) numbers gallery images in the same
+page order and is stored with the facets, so the same selections filter
+the photos.
+
+scripts/build-facet-index.py writes the index to build/facets.idx as part
+of the content build. If the file is missing or from another content
+version, the server logs an error and builds the index from the menu
+without opening any image: photo sizes are unknown until the script runs.
+"""
+
+import marshal
+from pathlib import Path
+from typing import Optional, Callable, Dict, List, Any
+
+from server.photos import PhotoIndex, build_photo_data
+from server.search import fold
+
+LAYOUT = 2
+
+# Facets taken from a fixed path position: facet -> (sections, position)
+PATH_FACETS = {
+    'section': (None, 0),
+    'habitat': (('ziva-priroda',), 1),
+    'group': (('ziva-priroda',), 2),
+    'category': (('geologie', 'chranena-uzemi'), 1),
+}
+
+# Facets taken from a directory name prefix at any depth
+PREFIX_FACETS = {
+    'district': 'okres-',
+}
+
+FACETS = list(PATH_FACETS) + list(PREFIX_FACETS)
+
+
+def path_facets(url: str) -> List[tuple]:
+    """
+    (facet, value, directory URL) pairs for the directories above a page.
+
+    A page belongs to a facet value only if it lies below that directory;
+    the directory page itself (e.g. the okres-prerov index) does not.
+    """
+    parts = url.split('/')
+    pairs = []
+    for facet, (sections, position) in PATH_FACETS.items():
+        if position < len(parts) - 1 and (sections is None or parts[0] in sections):
+            pairs.append((facet, parts[position], '/'.join(parts[:position + 1])))
+    for facet, prefix in PREFIX_FACETS.items():
+        for position, part in enumerate(parts[:-1]):
+            if part.startswith(prefix):
+                pairs.append((facet, part, '/'.join(parts[:position + 1])))
+    return pairs
+
+
+def bit_ids(bits: int) -> List[int]:
+    """Positions of the set bits, ascending."""
+    ids = []
+    binary = bin(bits)[:1:-1]  # Least significant bit first
+    position = binary.find('1')
+    while position >= 0:
+        ids.append(position)
+        position = binary.find('1', position + 1)
+    return ids
+
+
+class FacetIndex:
+    """
+    Bitsets of pages per facet value.
+
+    Usage:
+        index = FacetIndex.load(path, version) or FacetIndex.build(menu)
+        bits = index.select(group='zivocichove', habitat='rybnik')
+        index.items(bits)      # [{'url': ..., 'name': ...}, ...] by name
+        index.counts(bits, 'district')
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version = data['version']
+        self.pages = data['pages']
+        self.values = data['values']
+        self.labels = data['labels']
+        self.all = (1 << len(self.pages)) - 1
+        self.photos = PhotoIndex(data['photos'], self.pages)
+
+    # -------------------------------------------------------------------------
+    # Build / load / save
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, menu: Dict[str, Any], read_sizes: bool = True) -> 'FacetIndex':
+        """Index every page in the menu by the directories above it."""
+        return cls(build_facet_data(menu, read_sizes))
+
+    @classmethod
+    def load(cls, path: Path, version: Optional[str] = None) -> Optional['FacetIndex']:
+        """
+        Load an index written by save().
+
+        Returns None if the file is missing, unreadable or was built from
+        a content version other than `version` (when given).
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if data.get('layout') != LAYOUT or (version is not None and data['version'] != version):
+            return None
+        return cls(data)
+
+    def save(self, path: Path):
+        """Write the index for load() (written aside and renamed into place)."""
+        data = {
+            'layout': LAYOUT,
+            'version': self.version,
+            'pages': self.pages,
+            'values': self.values,
+            'labels': self.labels,
+            'photos': self.photos.data,
+        }
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(data, f)
+        tmp_path.replace(path)
+
+    # -------------------------------------------------------------------------
+    # Query
+    # -------------------------------------------------------------------------
+
+    def select(self, **filters: str) -> int:
+        """Pages having every given facet value (unknown values match nothing)."""
+        bits = self.all
+        for facet, value in filters.items():
+            if value:
+                bits &= self.values.get(facet, {}).get(value, 0)
+        return bits
+
+    def items(self, bits: int, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, str]]:
+        """Pages of a bitset in name order, optionally a slice of them."""
+        return [{'url': self.pages[i][0], 'name': self.pages[i][1]}
+                for i in bit_ids(bits)[start:stop]]
+
+    def counts(self, bits: int, facet: str, count: Callable[[int], int] = int.bit_count) -> List[Dict[str, Any]]:
+        """
+        Values of a facet within a bitset, with page counts.
+
+        Args:
+            count: Counts a bitset (default: its pages; e.g. photos.count)
+
+        Returns:
+            [{'value': 'okres-prerov', 'label': 'Okres Přerov', 'count': 12}, ...]
+            for the values with at least one page, by label
+        """
+        labels = self.labels.get(facet, {})
+        counts = []
+        for value, value_bits in self.values.get(facet, {}).items():
+            value_count = count(bits & value_bits)
+            if value_count:
+                counts.append({'value': value, 'label': labels.get(value, value), 'count': value_count})
+        counts.sort(key=lambda entry: fold(entry['label']))
+        return counts
+
+
+def build_facet_data(menu: Dict[str, Any], read_sizes: bool = True) -> Dict[str, Any]:
+    """
+    Facet bitsets of every page in the menu.
+
+    read_sizes=False skips reading photo sizes (see build_photo_data).
+
+    Returns:
+        Data for FacetIndex(): {'layout', 'version',
+        'pages': [[url, name], ...] in name order,
+        'values': {facet: {value: bitset}},
+        'labels': {facet: {value: name of the first directory seen}},
+        'photos': build_photo_data() of the pages}
+    """
+    by_url = menu['by_url']
+    urls = sorted(by_url, key=lambda url: (fold(by_url[url]['name']), url))
+
+    values: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+    labels: Dict[str, Dict[str, str]] = {facet: {} for facet in FACETS}
+    for number, url in enumerate(urls):
+        for facet, value, dir_url in path_facets(url):
+            values[facet][value] = values[facet].get(value, 0) | (1 << number)
+            if value not in labels[facet] and dir_url in by_url:
+                labels[facet][value] = by_url[dir_url]['name']
+
+    pages = [[url, by_url[url]['name']] for url in urls]
+    return {
+        'layout': LAYOUT,
+        'version': menu['version'],
+        'pages': pages,
+        'values': values,
+        'labels': labels,
+        'photos': build_photo_data(pages, read_sizes),
+    }
@@ -0,0 +1,241 @@
+"""
+WSGI fast path for content images.
+
+Tile and gallery images are most of the requests on every screen, and none
+of them need Flask: the file for each URL is known once the content tree
+has been scanned. FastPathMiddleware sits in front of the Flask app,
+looks the request path up in an index of image URLs built from the content
+tree and streams the file with the server's wsgi.file_wrapper and headers
+computed when the index was built. Anything else - other paths, unknown
+images, Range requests, files that changed on disk - goes to Flask, whose
+routes in server/app.py still serve the same URLs.
+
+Under gunicorn, wsgi.file_wrapper sends files with os.sendfile(), so the
+bytes never pass through Python: loose files whole, and images in the
+image pack (server/imagepack.py) from their offset in the archive, bounded
+by Content-Length. With a front server, the worker can hand off the
+transfer entirely (see OFFLOAD_MODES): the response carries only headers
+naming the file, and nginx or Apache sends it. Offloading takes precedence
+over the pack, which then serves only images with no loose file.
+
+Usage:
+    app.wsgi_app = FastPathMiddleware(app.wsgi_app, get_image_index)
+"""
+
+import os
+from email.utils import formatdate
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from werkzeug.wsgi import FileWrapper
+
+from server.imagepack import ImagePack, PackedImage, find_images
+
+# URL prefix of everything in the index
+PREFIX = '/content/'
+
+# Read size for servers without wsgi.file_wrapper
+BLOCK_SIZE = 64 * 1024
+
+# Same caching policy as Flask's send_from_directory: revalidate by ETag
+CACHE_CONTROL = 'no-cache'
+
+# Front server transfer modes:
+#   'x-accel-redirect'  nginx; header is an internal location URL (prefix +
+#                       path relative to content/)
+#   'x-sendfile'        Apache mod_xsendfile / lighttpd; header is the
+#                       absolute file path
+OFFLOAD_MODES = ('x-accel-redirect', 'x-sendfile')
+
+
+def offload_header(mode: str, path: Path, content_dir: Path, prefix: str) -> Tuple[str, str]:
+    """
+    Header that makes the front server send a content file.
+
+    Args:
+        mode: One of OFFLOAD_MODES
+        path: Absolute file path
+        content_dir: Content root the nginx internal location aliases
+        prefix: URL prefix of that internal location (x-accel-redirect)
+
+    Returns:
+        (header name, value)
+    """
+    if mode == 'x-accel-redirect':
+        return 'X-Accel-Redirect', prefix + quote(path.relative_to(content_dir).as_posix())
+    if mode == 'x-sendfile':
+        return 'X-Sendfile', _wsgi_path(str(path))
+    raise ValueError(f"Unknown offload mode: {mode}")
+
+
+def _wsgi_path(url: str) -> str:
+    """URL path as it appears in PATH_INFO (UTF-8 bytes decoded as latin-1)."""
+    return url.encode('utf-8').decode('latin-1')
+
+
+class ImageEntry:
+    """An indexed image and its precomputed response headers."""
+
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'last_modified', 'headers',
+                 'not_modified_headers', 'offload_headers', 'pack', 'packed')
+
+    def __init__(self, path: Path, size: int, mtime_ns: int, etag: Optional[str] = None,
+                 offload_headers: Optional[List[Tuple[str, str]]] = None,
+                 pack: Optional[ImagePack] = None, packed: Optional[PackedImage] = None):
+        """
+        Args:
+            path: Loose file (may be missing when the image is packed)
+            size, mtime_ns: Size and modification time of the image
+            etag: Quoted ETag; derived from size and mtime if not given
+            offload_headers: Headers naming the file for a front server
+            pack, packed: Image pack to serve from and the image's record in it
+        """
+        self.path = str(path)
+        self.size = size
+        self.mtime = mtime_ns
+        self.etag = etag or f'"{size:x}-{mtime_ns:x}"'
+        self.last_modified = formatdate(mtime_ns / 1e9, usegmt=True)
+        self.pack = pack
+        self.packed = packed
+        self.not_modified_headers = [
+            ('ETag', self.etag),
+            ('Last-Modified', self.last_modified),
+            ('Cache-Control', CACHE_CONTROL),
+        ]
+        self.headers = [
+            ('Content-Type', 'image/jpeg'),
+            ('Content-Length', str(size)),
+        ] + self.not_modified_headers
+        self.offload_headers = None
+        if offload_headers is not None:
+            self.offload_headers = [('Content-Type', 'image/jpeg')] + offload_headers + self.not_modified_headers
+
+
+def build_image_index(content_dir: Path, offload: Optional[str] = None,
+                      offload_prefix: str = '',
+                      pack: Optional[ImagePack] = None) -> Dict[str, ImageEntry]:
+    """
+    Map image URL paths to files.
+
+    Covers the URLs of the image routes in server/app.py:
+    /content/<url>/tile.jpg, /content/<url>/header.jpg (served from
+    tile.jpg) and /content/<url>/gallery/<file>.jpg.
+
+    Images in the pack are served from it unless the loose file differs
+    from the packed copy (edited after the pack was built), or offloading
+    is on and the loose file exists (the front server sends it).
+
+    Args:
+        content_dir: Content root
+        offload: None to send loose files from the worker, else one of OFFLOAD_MODES
+        offload_prefix: nginx internal location for 'x-accel-redirect'
+        pack: Image pack to serve from, if any
+
+    Returns:
+        {'/content/geologie/kras/tile.jpg': ImageEntry, ...}
+    """
+    paths = {image.relative_to(content_dir).as_posix() for image in find_images(content_dir)}
+    if pack is not None:
+        paths.update(pack.images)
+
+    index = {}
+    for rel in paths:
+        path = content_dir / rel
+        record = pack.get(rel) if pack is not None else None
+        try:
+            st = path.stat()
+        except OSError:
+            st = None
+
+        packed = record is not None and (
+            st is None or (not offload and (st.st_size, st.st_mtime_ns) == (record.length, record.mtime_ns)))
+        if packed:
+            entry = ImageEntry(path, record.length, record.mtime_ns, etag=f'"{record.hash}"',
+                               pack=pack, packed=record)
+        elif st is not None:
+            headers = None
+            if offload:
+                headers = [offload_header(offload, path, content_dir, offload_prefix)]
+            entry = ImageEntry(path, st.st_size, st.st_mtime_ns, offload_headers=headers)
+        else:
+            continue
+
+        index[_wsgi_path(f"{PREFIX}{rel}")] = entry
+        if rel.endswith('/tile.jpg'):
+            index[_wsgi_path(f"{PREFIX}{rel[:-len('tile.jpg')]}header.jpg")] = entry
+
+    return index
+
+
+class FastPathMiddleware:
+    """Serve indexed images before the request reaches Flask."""
+
+    def __init__(self, app, get_index: Callable[[], Optional[Dict[str, ImageEntry]]]):
+        """
+        Args:
+            app: WSGI application to pass other requests to
+            get_index: Returns the current image index, or None to disable
+        """
+        self.app = app
+        self.get_index = get_index
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if (path.startswith(PREFIX)
+                and environ['REQUEST_METHOD'] in ('GET', 'HEAD')
+                and 'HTTP_RANGE' not in environ):
+            index = self.get_index()
+            entry = index.get(path) if index else None
+            if entry is not None:
+                response = self.serve(entry, environ, start_response)
+                if response is not None:
+                    return response
+        return self.app(environ, start_response)
+
+    def serve(self, entry: ImageEntry, environ, start_response):
+        """Send an indexed file; None if it changed since it was indexed.
+
+        Packed images are sent from the pack file at their offset. In
+        offload mode only headers are sent and the front server reads the
+        file, so the worker never opens it.
+        """
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            not_modified = entry.etag in if_none_match or if_none_match.strip() == '*'
+        else:
+            not_modified = environ.get('HTTP_IF_MODIFIED_SINCE') == entry.last_modified
+        if not_modified:
+            start_response('304 Not Modified', entry.not_modified_headers)
+            return []
+
+        if entry.packed is not None:
+            start_response('200 OK', entry.headers)
+            if environ['REQUEST_METHOD'] == 'HEAD':
+                return []
+            file_wrapper = environ.get('wsgi.file_wrapper')
+            if file_wrapper is None:
+                return [entry.pack.read(entry.packed)]
+            # Content-Length stops the server at the end of the image
+            return file_wrapper(entry.pack.open_image(entry.packed), BLOCK_SIZE)
+
+        if entry.offload_headers is not None:
+            start_response('200 OK', entry.offload_headers)
+            return []
+
+        try:
+            f = open(entry.path, 'rb')
+        except OSError:
+            return None
+        st = os.fstat(f.fileno())
+        if st.st_size != entry.size or st.st_mtime_ns != entry.mtime:
+            f.close()
+            return None
+
+        start_response('200 OK', entry.headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            f.close()
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(f, BLOCK_SIZE)
+
@@ -0,0 +1,59 @@
+"""
+Jinja fragment caching.
+
+Adds a `{% cache %}` tag that stores the rendered body in the app's
+FragmentCache, keyed by the tag arguments and the content version:
+
+    {% cache 'tiles', parent_url, page %}
+        ... expensive markup ...
+    {% endcache %}
+
+If any key argument is undefined or None, or no content version is
+available (debug mode), the body is rendered normally.
+"""
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from jinja2.runtime import Undefined
+
+from server import timing
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension implementing the {% cache key, ... %} tag."""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        # Configured by the application after the environment is created
+        environment.extend(fragment_cache=None, fragment_cache_version=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_cache_support', [nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, key_parts, caller):
+        """Return the cached fragment or render and store it."""
+        cache = self.environment.fragment_cache
+        get_version = self.environment.fragment_cache_version
+        version = get_version() if get_version else None
+
+        if cache is None or version is None or any(
+                part is None or isinstance(part, Undefined) for part in key_parts):
+            return caller()
+
+        key = tuple(key_parts)
+        value = cache.get(key, version)
+        timing.hit('fragment-cache', value is not None)
+        if value is None:
+            value = caller()
+            cache.set(key, version, value)
+        return value
@@ -0,0 +1,206 @@
+"""
+Packed image archive.
+
+scripts/build-image-pack.py copies every content image (tiles and gallery
+images) into one archive file. The server opens and maps it once, and
+serves images from that open archive without looking up or stat'ing a
+path per request; loose files under content/ remain the fallback for
+anything the archive does not hold or holds an outdated copy of. Under
+gunicorn, packed images are sent with sendfile() from their offset in the
+archive, so the bytes never pass through Python either.
+
+A rebuilt archive replaces the file, not its contents: the server keeps
+reading the archive it opened, whose offsets match the index it loaded,
+until the content version changes and the pack is reopened.
+
+File layout:
+
+    header      magic, layout, image count, index offset, index length
+    images      each image's bytes, starting on a page boundary
+    index       JSON list of [path, offset, length, mtime_ns, hash], where
+                path is relative to content/ and hash is a blake2b digest
+
+Page-aligned images keep each image on its own pages, so reading one never
+pulls parts of its neighbours into the page cache.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+MAGIC = b'PRKIMGPK'
+LAYOUT = 1
+
+HEADER = struct.Struct('<8sIIQQ')  # magic, layout, count, index offset, index length
+ALIGN = mmap.PAGESIZE
+
+
+def find_images(content_dir: Path):
+    """
+    Every image served from the content tree, in path order.
+
+    Tiles (<url>/tile.jpg, also served as header.jpg) and gallery images
+    (<url>/gallery/*.jpg); path order keeps a page's images together.
+    """
+    tiles = [p for p in content_dir.rglob('tile.jpg') if p.parent != content_dir]
+    return sorted(tiles + list(content_dir.rglob('gallery/*.jpg')))
+
+
+def image_hash(data: bytes) -> str:
+    """Content hash stored in the index (also used as the ETag)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class PackedImage:
+    """Index record of one image in the archive."""
+
+    __slots__ = ('path', 'offset', 'length', 'mtime_ns', 'hash')
+
+    def __init__(self, path: str, offset: int, length: int, mtime_ns: int, hash: str):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.mtime_ns = mtime_ns
+        self.hash = hash
+
+
+class ImageFile:
+    """
+    One image of the archive as a read-only file.
+
+    Owns `fd`, a descriptor of the archive positioned at the image, so
+    gunicorn's sendfile() (which starts at the current offset and stops at
+    Content-Length) sends just the image; read() stops at its end for
+    servers that copy.
+    """
+
+    def __init__(self, fd: int, record: PackedImage):
+        self._fd = fd
+        self._position = record.offset
+        self._end = record.offset + record.length
+        os.lseek(fd, record.offset, os.SEEK_SET)
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def read(self, size: int = -1) -> bytes:
+        left = self._end - self._position
+        if size < 0 or size > left:
+            size = left
+        data = os.pread(self._fd, size, self._position)
+        self._position += len(data)
+        return data
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class ImagePack:
+    """
+    Read-only, memory-mapped image archive.
+
+    Usage:
+        pack = ImagePack.open(path)        # None if missing or invalid
+        record = pack.get('geologie/kras/tile.jpg')
+        data = pack.read(record)
+    """
+
+    def __init__(self, path: Path):
+        # Kept open with the map: images are read from this archive even
+        # after a rebuild replaces the file at `path`
+        self._fd = os.open(path, os.O_RDONLY)
+        try:
+            self._map = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+            magic, layout, count, index_offset, index_length = HEADER.unpack_from(self._map, 0)
+            if (magic, layout) != (MAGIC, LAYOUT):
+                self._map.close()
+                raise ValueError(f"Not an image pack: {path}")
+        except (OSError, ValueError, struct.error):
+            os.close(self._fd)
+            self._fd = -1
+            raise
+
+        index = json.loads(self._map[index_offset:index_offset + index_length])
+        self.path = path
+        self.images: Dict[str, PackedImage] = {
+            record[0]: PackedImage(*record) for record in index
+        }
+
+    def __del__(self):
+        # Requests still sending an image hold descriptors of their own
+        if getattr(self, '_fd', -1) >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    @classmethod
+    def open(cls, path: Path) -> Optional['ImagePack']:
+        """Map an archive, or return None when there is none to use."""
+        try:
+            return cls(path)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def get(self, path: str) -> Optional[PackedImage]:
+        """Index record for a path relative to content/."""
+        return self.images.get(path)
+
+    def read(self, record: PackedImage) -> bytes:
+        """Image bytes, copied straight from the mapped pages."""
+        return self._map[record.offset:record.offset + record.length]
+
+    def open_image(self, record: PackedImage) -> 'ImageFile':
+        """An image as a file, for wsgi.file_wrapper and sendfile()."""
+        try:
+            # A new open file description of the same archive: its offset
+            # is this request's own, also under threaded workers
+            fd = os.open(f'/proc/self/fd/{self._fd}', os.O_RDONLY)
+        except OSError:
+            # No procfs: a duplicate shares the offset, which is safe with
+            # one request per worker at a time (sync workers)
+            fd = os.dup(self._fd)
+        return ImageFile(fd, record)
+
+    def willneed(self, record: PackedImage):
+        """Ask the kernel to start reading an image's pages."""
+        if hasattr(self._map, 'madvise'):
+            self._map.madvise(mmap.MADV_WILLNEED, record.offset, record.length)
+
+
+def write_pack(pack_path: Path, content_dir: Path, images: Iterable[Path]) -> int:
+    """
+    Write an archive of the given images.
+
+    The archive is written next to pack_path and renamed into place, so a
+    running server keeps reading the previous archive it holds open.
+
+    Returns:
+        Number of images written
+    """
+    tmp_path = pack_path.with_name(pack_path.name + '.tmp')
+    index = []
+
+    with open(tmp_path, 'wb') as f:
+        f.write(bytes(ALIGN))  # Header placeholder, first image on page 1
+        for image in images:
+            data = image.read_bytes()
+            st = image.stat()
+            offset = f.tell()
+            f.write(data)
+            f.write(bytes(-f.tell() % ALIGN))
+            index.append([image.relative_to(content_dir).as_posix(), offset, len(data),
+                          st.st_mtime_ns, image_hash(data)])
+
+        index_data = json.dumps(index, ensure_ascii=False).encode('utf-8')
+        index_offset = f.tell()
+        f.write(index_data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, LAYOUT, len(index), index_offset, len(index_data)))
+
+    os.replace(tmp_path, pack_path)
+    return len(index)
@@ -0,0 +1,229 @@
+"""
+Cross-gallery photo index for browsing all photos at once.
+
+Every gallery image is numbered, gallery after gallery, with the galleries
+in the page order of the facet index (server/facets.py). The index is a
+handful of flat arrays over those numbers:
+
+    starts      first photo of each page (pages without a gallery own none)
+    files       gallery file name per photo (string table)
+    thumbs      thumbnail file name per photo, '' to use the photo itself
+    captions    caption per photo (string table)
+    sizes       width and height per photo
+
+Because a page's photos are contiguous, a facet selection (a bitset of
+pages) becomes a list of photo ranges; its running totals are cached per
+selection, so any page of results is a binary search plus a slice.
+
+Usage:
+    photos = PhotoIndex(build_photo_data(pages), pages)
+    photos.count(bits), photos.slice(bits, 48, 72)
+"""
+
+import bisect
+import random
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Any, Tuple
+
+from server.content import get_gallery, get_gallery_image_path
+
+# Narrower photos look poor full screen in attract mode
+ATTRACT_MIN_WIDTH = 600
+
+
+def _uint32(data: bytes) -> array:
+    values = array('I')
+    values.frombytes(data)
+    return values
+
+
+class StringTable:
+    """Strings joined into one, indexable by number."""
+
+    def __init__(self, text: str, offsets: bytes):
+        self._text = text
+        self._offsets = _uint32(offsets)
+
+    @staticmethod
+    def pack(strings: List[str]) -> Tuple[str, bytes]:
+        """(text, offsets) for StringTable()."""
+        offsets = array('I', [0])
+        for string in strings:
+            offsets.append(offsets[-1] + len(string))
+        return ''.join(strings), offsets.tobytes()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._text[self._offsets[i]:self._offsets[i + 1]]
+
+
+class PhotoIndex:
+    """Flat arrays of all gallery photos (see module docstring)."""
+
+    # Facet selections whose photo ranges are kept
+    SELECTIONS = 64
+
+    def __init__(self, data: Dict[str, Any], pages: List[List[str]]):
+        self.data = data
+        self.pages = pages
+        self._starts = _uint32(data['starts'])
+        self._files = StringTable(*data['files'])
+        self._thumbs = StringTable(*data['thumbs'])
+        self._captions = StringTable(*data['captions'])
+        self._sizes = array('H')
+        self._sizes.frombytes(data['sizes'])
+        self._selections: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._files)
+
+    def _pages(self, bits: int):
+        """Page numbers of the set bits."""
+        binary = bin(bits)[:1:-1]
+        page = binary.find('1')
+        while page >= 0:
+            yield page
+            page = binary.find('1', page + 1)
+
+    def _selection(self, bits: int):
+        """Pages of a selection that own photos, with running photo totals."""
+        with self._lock:
+            selection = self._selections.get(bits)
+            if selection is not None:
+                self._selections.move_to_end(bits)
+                return selection
+
+        starts = self._starts
+        pages = array('I')
+        totals = array('I', [0])
+        for page in self._pages(bits):
+            count = starts[page + 1] - starts[page]
+            if count:
+                pages.append(page)
+                totals.append(totals[-1] + count)
+
+        selection = (pages, totals)
+        with self._lock:
+            self._selections[bits] = selection
+            if len(self._selections) > self.SELECTIONS:
+                self._selections.popitem(last=False)
+        return selection
+
+    def count(self, bits: int) -> int:
+        """Photos on the pages of a facet bitset (not cached, for facet counts)."""
+        with self._lock:
+            selection = self._selections.get(bits)
+        if selection is not None:
+            return selection[1][-1]
+        starts = self._starts
+        return sum(starts[page + 1] - starts[page] for page in self._pages(bits))
+
+    def slice(self, bits: int, start: int, stop: int) -> List[Dict[str, Any]]:
+        """
+        Photos [start, stop) of the pages of a facet bitset.
+
+        Returns:
+            [{'path': 'ziva-priroda/.../gallery/01-x.jpg', 'thumb': ...,
+              'caption': '...', 'width': 658, 'height': 618,
+              'page_url': 'ziva-priroda/...', 'page_name': '...',
+              'index': position in the page's gallery}, ...]
+        """
+        pages, totals = self._selection(bits)
+        stop = min(stop, totals[-1])
+        photos = []
+        position = bisect.bisect_right(totals, start) - 1
+        number = start
+        while number < stop:
+            page = pages[position]
+            page_url, page_name = self.pages[page]
+            first = self._starts[page]
+            end = min(stop, totals[position + 1])
+            for offset in range(number - totals[position], end - totals[position]):
+                photo = first + offset
+                path = f"{page_url}/gallery/{self._files[photo]}"
+                thumb = self._thumbs[photo]
+                photos.append({
+                    'path': path,
+                    'thumb': f"{page_url}/gallery/{thumb}" if thumb else path,
+                    'caption': self._captions[photo],
+                    'width': self._sizes[2 * photo],
+                    'height': self._sizes[2 * photo + 1],
+                    'page_url': page_url,
+                    'page_name': page_name,
+                    'index': offset,
+                })
+            number = end
+            position += 1
+        return photos
+
+
+def attract_playlist(photos: PhotoIndex, seed: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Shuffled photos for the attract-mode slideshow.
+
+    Takes captioned landscape photos at least ATTRACT_MIN_WIDTH wide,
+    shuffled with a fixed seed (the content version), so every worker
+    serves the same playlist.
+    """
+    every = photos.slice((1 << len(photos.pages)) - 1, 0, len(photos))
+    playlist = [
+        {'src': photo['path'], 'caption': photo['caption'],
+         'page_name': photo['page_name'], 'page_url': photo['page_url']}
+        for photo in every
+        if photo['caption'] and photo['width'] >= ATTRACT_MIN_WIDTH and photo['width'] >= photo['height']
+    ]
+    random.Random(seed).shuffle(playlist)
+    return playlist[:limit]
+
+
+def image_size(url: str, filename: str) -> Tuple[int, int]:
+    """Pixel size of a gallery image ((0, 0) if it cannot be read)."""
+    from PIL import Image
+
+    path = get_gallery_image_path(url, filename)
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except (OSError, TypeError, ValueError):
+        return 0, 0
+
+
+def build_photo_data(pages: List[List[str]], read_sizes: bool = True) -> Dict[str, Any]:
+    """
+    Photo arrays for the galleries of `pages` ([url, name] in facet order).
+
+    Reads the pixel size of every image, so this belongs in the content
+    build (scripts/build-facet-index.py). With read_sizes=False no image
+    is opened and every size is (0, 0), as for unreadable images.
+
+    Returns:
+        Data for PhotoIndex()
+    """
+    starts = array('I', [0])
+    files, thumbs, captions = [], [], []
+    dimensions = array('H')
+
+    for url, _ in pages:
+        gallery = get_gallery(url)
+        for image in (gallery['images'] if gallery else ()):
+            filename = image['path'].rsplit('/', 1)[1]
+            thumb = image['thumb'].rsplit('/', 1)[1]
+            files.append(filename)
+            thumbs.append(thumb if thumb != filename else '')
+            captions.append(image['caption'])
+            width, height = image_size(url, filename) if read_sizes else (0, 0)
+            dimensions.extend((min(width, 0xFFFF), min(height, 0xFFFF)))
+        starts.append(len(files))
+
+    return {
+        'starts': starts.tobytes(),
+        'files': StringTable.pack(files),
+        'thumbs': StringTable.pack(thumbs),
+        'captions': StringTable.pack(captions),
+        'sizes': dimensions.tobytes(),
+    }
@@ -0,0 +1,118 @@
+"""
+Placeholder tiles for menu nodes without a tile image.
+
+Rendered on demand as a small SVG - the node title in white on museum red
+- instead of a JPEG per node baked by a batch job, so they need no files
+on disk and stay sharp at any tile size. Titles are wrapped by Czech
+typesetting rules: a one-letter preposition or conjunction (v, k, s, z,
+o, u, a, i) never ends a line, and compound names break only after their
+hyphen (Frýdek-|Místek). The font size is the largest that fits.
+
+An SVG loaded through <img> cannot use the page's web fonts, so the text
+is set in fonts installed on the kiosk: Open Sans from the fonts-open-sans
+package (config/setup-raspberry-pi.sh), else DejaVu Sans, which Raspberry
+Pi OS ships.
+
+Usage:
+    placeholder_svg('Chráněná krajinná oblast Litovelské Pomoraví')  # bytes
+"""
+
+from functools import lru_cache
+from html import escape
+from typing import List
+
+# Museum red #cc141c, as the pre-baked tiles had
+BG_COLOR = '#cc141c'
+TEXT_COLOR = '#ffffff'
+
+# System fonts (not the self-hosted web fonts, see above)
+FONT_FAMILY = "'Open Sans', 'DejaVu Sans', sans-serif"
+
+# Square viewBox (tiles are square; scales to any size)
+SIZE = 280
+PADDING = 24
+
+# Font sizes tried, largest first
+FONT_SIZES = range(36, 15, -2)
+LINE_HEIGHT = 1.2
+
+# Average bold glyph width in em, for fitting lines without font metrics
+GLYPH_WIDTH = 0.6
+
+# One-letter words that stay on the line of the following word
+CLINGING_WORDS = {'a', 'i', 'k', 'o', 's', 'u', 'v', 'z'}
+
+# Placeholders kept rendered (one per title)
+CACHED_PLACEHOLDERS = 1024
+
+
+def _tokens(title: str) -> List[str]:
+    """Words of a title, one-letter words joined to the next by a no-break space."""
+    tokens = []
+    glue = False
+    for word in title.split():
+        if glue:
+            tokens[-1] += '\u00a0' + word
+        else:
+            tokens.append(word)
+        glue = word.lower() in CLINGING_WORDS
+    return tokens
+
+
+def _parts(token: str) -> List[str]:
+    """A token split after its hyphens, the only other places it may break."""
+    parts = token.split('-')
+    return [part + '-' for part in parts[:-1]] + [parts[-1]]
+
+
+def wrap_title(title: str, width: int) -> List[str]:
+    """
+    Lines of at most `width` characters where the words allow.
+
+    A single word longer than `width` gets a line of its own.
+    """
+    lines: List[str] = []
+    line = ''
+    for token in _tokens(title):
+        for position, part in enumerate(_parts(token)):
+            # Parts of one hyphenated word join without a space
+            joined = line + part if position else (f"{line} {part}" if line else part)
+            if len(joined) <= width or not line:
+                line = joined
+            else:
+                lines.append(line)
+                line = part
+    if line:
+        lines.append(line)
+    return lines
+
+
+def fit_title(title: str) -> tuple:
+    """(font size, lines) of the largest font size the wrapped title fits at."""
+    usable = SIZE - 2 * PADDING
+    for font_size in FONT_SIZES:
+        width = int(usable / (font_size * GLYPH_WIDTH))
+        lines = wrap_title(title, width)
+        if (max(len(line) for line in lines) <= width
+                and len(lines) * font_size * LINE_HEIGHT <= usable):
+            return font_size, lines
+    return font_size, lines
+
+
+@lru_cache(maxsize=CACHED_PLACEHOLDERS)
+def placeholder_svg(title: str) -> bytes:
+    """SVG placeholder tile showing `title`."""
+    font_size, lines = fit_title(title.strip() or '?')
+    line_height = font_size * LINE_HEIGHT
+    # Baseline of the first line, centring the block (cap height ~0.72 em)
+    top = (SIZE - len(lines) * line_height) / 2 + (line_height + 0.72 * font_size) / 2
+    spans = ''.join(
+        f'<tspan x="{SIZE // 2}" y="{top + i * line_height:.1f}">{escape(line)}</tspan>'
+        for i, line in enumerate(lines))
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SIZE} {SIZE}" '
+        f'width="{SIZE}" height="{SIZE}">'
+        f'<rect width="{SIZE}" height="{SIZE}" fill="{BG_COLOR}"/>'
+        f'<text fill="{TEXT_COLOR}" font-family="{FONT_FAMILY}" font-size="{font_size}" '
+        f'font-weight="700" text-anchor="middle">{spans}</text></svg>'
+    ).encode('utf-8')
@@ -0,0 +1,156 @@
+"""
+Offline precache manifest for the kiosk service worker.
+
+The manifest is derived from the menu tree and lists every URL the kiosk
+can display: full pages and their HTMX partials, tile pagination partials,
+gallery viewer partials, tile and gallery images, and static assets. Each
+entry carries a revision so the service worker can tell what changed; the
+whole manifest is tagged with the content version.
+"""
+
+import re
+from html import unescape
+from typing import Callable, Dict, List, Any, Tuple
+from urllib.parse import quote
+
+from server.assets import STATIC_DIR
+from server.content import CONTENT_DIR, get_gallery, get_file_revision
+
+# Build manifests and precompressed siblings are never requested directly
+STATIC_SKIP_SUFFIXES = {'.json', '.br', '.gz'}
+
+
+# =============================================================================
+# Manifest Entries
+# =============================================================================
+
+def _entry(url: str, revision: str, partial: bool = False) -> Dict[str, Any]:
+    """Build a single manifest entry."""
+    return {'url': url, 'revision': revision, 'partial': partial}
+
+
+def _page_entries(url: str, version: str) -> List[Dict[str, Any]]:
+    """Full page and HTMX partial for a page URL."""
+    return [_entry(url, version), _entry(url, version, partial=True)]
+
+
+def _node_entries(item: Dict, version: str, per_page: int) -> List[Dict[str, Any]]:
+    """All entries for one menu node (page, tiles, gallery)."""
+    url = item['url']
+    entries = _page_entries(f"/{url}", version)
+
+    tile_path = CONTENT_DIR / url / 'tile.jpg'
+    if tile_path.exists():
+        entries.append(_entry(f"/content/{url}/tile.jpg", get_file_revision(tile_path)))
+    else:
+        # SVG placeholder rendered from the title (server/placeholders.py)
+        entries.append(_entry(f"/content/{url}/tile.svg", version))
+
+    children = item.get('children', [])
+    if children:
+        # tile-section.html loads the first page without a page parameter
+        entries.append(_entry(f"/partials/tiles?parent={url}", version, partial=True))
+        total_pages = (len(children) + per_page - 1) // per_page
+        for page_num in range(1, total_pages + 1):
+            entries.append(_entry(f"/partials/tiles?parent={url}&page={page_num}", version, partial=True))
+
+    if (CONTENT_DIR / url / 'gallery').is_dir():
+        gallery = get_gallery(url)
+        gallery_id = quote(gallery['id'], safe='/')
+        for index, image in enumerate(gallery['images']):
+            img_path = CONTENT_DIR / image['path']
+            entries.append(_entry(f"/content/{image['path']}", get_file_revision(img_path)))
+            entries.append(_entry(f"/partials/gallery?id={gallery_id}&index={index}", version, partial=True))
+
+    return entries
+
+
+def _static_entries() -> List[Dict[str, Any]]:
+    """Entries for every file under server/static (build metadata excluded)."""
+    return [
+        _entry(f"/static/{path.relative_to(STATIC_DIR).as_posix()}", get_file_revision(path))
+        for path in sorted(STATIC_DIR.rglob('*'))
+        if path.is_file() and path.suffix not in STATIC_SKIP_SUFFIXES
+    ]
+
+
+# =============================================================================
+# Manifest Building
+# =============================================================================
+
+def build_precache_manifest(menu: Dict[str, Any], per_page: int) -> Dict[str, Any]:
+    """
+    Build the service worker precache manifest from the menu tree.
+
+    Args:
+        menu: Menu tree from build_menu_tree()
+        per_page: Tiles per page, used to enumerate tile pagination partials
+
+    Returns:
+        {
+            'version': '3f9a0c12be45',
+            'entries': [
+                {'url': '/geologie', 'revision': '3f9a0c12be45', 'partial': False},
+                {'url': '/geologie', 'revision': '3f9a0c12be45', 'partial': True},
+                {'url': '/content/geologie/tile.jpg', 'revision': '2a9b0-65f1c2d0', 'partial': False},
+                ...
+            ]
+        }
+    """
+    version = menu['version']
+    entries = _page_entries('/', version) + _page_entries('/mapa', version)
+
+    for item in menu['by_url'].values():
+        entries.extend(_node_entries(item, version, per_page))
+
+    entries.extend(_static_entries())
+
+    return {'version': version, 'entries': entries}
+
+
+# =============================================================================
+# Manifest Check
+# =============================================================================
+
+# Endpoints whose URLs depend on visitor input (queries, facet filters);
+# they need the server and are never precached
+DYNAMIC_PREFIXES = ('/search', '/partials/search-', '/browse', '/photos', '/partials/photos')
+
+# URLs requested with HX-Request: hx-get, and the sibling and tile page
+# prefetches of swipe.js
+_HX_TAG = re.compile(r'<[^>]*\b(?:hx-get|data-(?:prev|next)-(?:url|page))="[^"]*"[^>]*>')
+_HX_URL = re.compile(r'\b(?:hx-get|data-(?:prev|next)-(?:url|page))="([^"]*)"')
+
+
+def htmx_urls(html: str) -> List[str]:
+    """URLs a rendered page requests as HTMX partials (disabled controls skipped)."""
+    urls = []
+    for tag in _HX_TAG.findall(html):
+        if re.search(r'\sdisabled\b', tag):
+            continue
+        urls.extend(unescape(url) for url in _HX_URL.findall(tag))
+    return urls
+
+
+def check_precache_manifest(manifest: Dict[str, Any],
+                            fetch: Callable[[str, bool], str]) -> List[Tuple[str, str]]:
+    """
+    Find HTMX requests of precached pages that the service worker cannot answer.
+
+    Args:
+        manifest: From build_precache_manifest()
+        fetch: Returns the HTML of a URL, as a partial when the flag is set
+
+    Returns:
+        [(page URL, partial URL missing from the manifest), ...]
+    """
+    partials = {entry['url'] for entry in manifest['entries'] if entry['partial']}
+    missing = []
+    for entry in manifest['entries']:
+        url = entry['url']
+        if url.startswith(('/static/', '/content/')):
+            continue
+        for hx_url in htmx_urls(fetch(url, entry['partial'])):
+            if hx_url not in partials and not hx_url.startswith(DYNAMIC_PREFIXES):
+                missing.append((url, hx_url))
+    return missing
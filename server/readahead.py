@@ -0,0 +1,115 @@
+"""
+Page cache read-ahead for images a rendered page links to.
+
+Reading a JPEG from the SD card for the first time is slow, but when a page
+is rendered the server already knows which images the browser asks for
+next: the page's tile, its first gallery images and its children's tiles.
+ReadAhead hands those paths to a background thread that asks the kernel to
+load them into the page cache (posix_fadvise WILLNEED), so the image
+requests that follow are served from memory.
+
+Usage:
+    readahead = ReadAhead(queue_size=256)
+    readahead.submit([path, ...])
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+# Files advised recently are skipped; the page cache still holds them
+RECENT_FILES = 4096
+
+# Chunk size when posix_fadvise is unavailable and files are read instead
+READ_CHUNK = 256 * 1024
+
+
+class ReadAhead:
+    """Bounded, deduplicating queue of files to pull into the page cache."""
+
+    def __init__(self, queue_size: int):
+        self._queue: 'queue.Queue[str]' = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._pending = set()  # Queued, not yet advised
+        self._recent: 'OrderedDict[str, None]' = OrderedDict()
+        self._pid = None
+        self.advised = 0
+        self.skipped = 0   # Already queued or recently advised
+        self.dropped = 0   # Queue full
+        self.missing = 0   # Could not be opened
+
+    def submit(self, paths: Iterable[Path]):
+        """Queue files for read-ahead without blocking the request."""
+        self._ensure_thread()
+        for path in paths:
+            path = str(path)
+            with self._lock:
+                if path in self._pending or path in self._recent:
+                    self.skipped += 1
+                    continue
+                try:
+                    self._queue.put_nowait(path)
+                except queue.Full:
+                    self.dropped += 1
+                    return
+                self._pending.add(path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since start."""
+        with self._lock:
+            return {
+                'queued': len(self._pending),
+                'advised': self.advised,
+                'skipped': self.skipped,
+                'dropped': self.dropped,
+                'missing': self.missing,
+            }
+
+    def _ensure_thread(self):
+        """Start the worker thread in this process (threads do not survive fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._pending.clear()
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            threading.Thread(target=self._run, args=(self._queue,),
+                             name='readahead', daemon=True).start()
+
+    def _run(self, work: 'queue.Queue[str]'):
+        while True:
+            path = work.get()
+            found = _load(path)
+            with self._lock:
+                self._pending.discard(path)
+                if found:
+                    self.advised += 1
+                    self._recent[path] = None
+                    while len(self._recent) > RECENT_FILES:
+                        self._recent.popitem(last=False)
+                else:
+                    self.missing += 1
+
+
+def _load(path: str) -> bool:
+    """Start loading a file into the page cache; False if it cannot be opened."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            while os.read(fd, READ_CHUNK):
+                pass
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+    return True
@@ -0,0 +1,94 @@
+"""
+Related pages by TF-IDF cosine similarity.
+
+Each page is a vector of its index terms (title, text and gallery
+captions, as tokenized for search) weighted by log term frequency times
+inverse document frequency, normalized to unit length. The most similar
+pages from other branches of the menu - not the page's own ancestors,
+descendants or siblings, which the menu already leads to - are its
+related pages.
+
+Vectors are sparse dicts and the dot products are accumulated over the
+postings of each term, so only pages sharing a term are ever compared;
+for the whole content tree this takes well under a second. Computed in
+the content build and stored with the search index (see server/search.py).
+"""
+
+import heapq
+import math
+from typing import Dict, List, Optional, Set
+
+# Related pages kept per page
+RELATED_PAGES = 4
+
+# Terms in more than this share of pages say nothing about similarity
+MAX_DOCUMENT_SHARE = 0.5
+
+
+def _parent(url: str) -> str:
+    return url.rsplit('/', 1)[0] if '/' in url else ''
+
+
+def same_branch(a: str, b: str) -> bool:
+    """Whether two pages are the same, nested in each other or siblings."""
+    return (a == b or a.startswith(b + '/') or b.startswith(a + '/')
+            or _parent(a) == _parent(b))
+
+
+def tfidf_vectors(documents: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, float]]:
+    """
+    Unit-length TF-IDF vectors of documents given as term counts.
+
+    Terms found in a single document or in more than MAX_DOCUMENT_SHARE of
+    them are dropped: they cannot make two documents similar, or make
+    every pair of them similar.
+    """
+    df: Dict[str, int] = {}
+    for counts in documents.values():
+        for term in counts:
+            df[term] = df.get(term, 0) + 1
+
+    total = len(documents)
+    idf = {term: math.log(total / count) for term, count in df.items()
+           if 1 < count <= total * MAX_DOCUMENT_SHARE}
+
+    vectors = {}
+    for key, counts in documents.items():
+        vector = {term: (1 + math.log(tf)) * idf[term] for term, tf in counts.items() if term in idf}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors[key] = {term: weight / norm for term, weight in vector.items()} if norm else {}
+    return vectors
+
+
+def related_pages(documents: Dict[str, Dict[str, int]], targets: Optional[Set[str]] = None,
+                  limit: int = RELATED_PAGES) -> Dict[str, List[str]]:
+    """
+    Most similar pages from other branches, per page.
+
+    Args:
+        documents: {url: {term: count}} for every page
+        targets: URLs that may be recommended (default: all)
+        limit: Related pages per page
+
+    Returns:
+        {url: [related url, ...] most similar first} for pages with any
+    """
+    vectors = tfidf_vectors(documents)
+
+    postings: Dict[str, List[tuple]] = {}
+    for url, vector in vectors.items():
+        if targets is None or url in targets:
+            for term, weight in vector.items():
+                postings.setdefault(term, []).append((url, weight))
+
+    related = {}
+    for url, vector in vectors.items():
+        scores: Dict[str, float] = {}
+        for term, weight in vector.items():
+            for other, other_weight in postings.get(term, ()):
+                scores[other] = scores.get(other, 0.0) + weight * other_weight
+        best = heapq.nlargest(limit, (
+            (score, other) for other, score in scores.items() if not same_branch(url, other)))
+        if best:
+            related[url] = [other for _, other in best]
+    return related
@@ -0,0 +1,496 @@
+"""
+Full-text search over page titles, page text and gallery captions.
+
+Text is folded to lowercase ASCII (Czech diacritics removed, so "zizala"
+finds "žížala"), split into words and reduced with a light Czech stemmer
+that strips case endings ("žížaly", "žížalami" -> "zizal"). An inverted
+index maps each stem to the documents containing it; queries are scored
+with BM25, title words counting TITLE_WEIGHT times.
+
+Search-as-you-type suggestions come from a separate prefix index over
+folded page titles and species names (SuggestIndex), queried once per
+keystroke of the on-screen keyboard. The related pages of each page
+(server/related.py) are computed from the same terms and stored with
+the index.
+
+scripts/build-search-index.py writes both indexes to build/search.idx as
+part of the content build; the server loads it once at startup and builds
+it in memory only if the file is missing or from another content version.
+
+Usage:
+    index = SearchIndex.load(path) or SearchIndex.build(menu)
+    results = index.search('zizala')
+    suggestions = index.suggestions.suggest('zizal')
+"""
+
+import bisect
+import heapq
+import threading
+import marshal
+import math
+import re
+import unicodedata
+from array import array
+from html import unescape
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, Callable, Dict, List, Any, NamedTuple
+
+from server.content import get_page_content, get_gallery
+from server.related import related_pages
+
+LAYOUT = 4
+
+# Page documents store no image; results show the page's tile
+PAGE_IMAGE = ''
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Title words count this many times in term frequency and document length
+TITLE_WEIGHT = 3
+
+# Plain text kept per document for result snippets
+SNIPPET_LENGTH = 180
+
+# Frequent Czech words, folded
+STOPWORDS = frozenset("""
+a aby ale ani az bez by byl byla byli bylo byt ci do i jak jako je jeho jeji
+jen jsou k ke kde kdyz ktera ktere ktery mezi na nad nebo nez o od po pod
+pri pro se si ta tak take tam te tedy to tu u v ve z za ze
+""".split())
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_SPACE_RE = re.compile(r'\s+')
+_PARAGRAPH_RE = re.compile(r'<p>(.*?)</p>', re.S)
+_SPECIES_RE = re.compile(r'[A-Z][a-z]+ (?:x )?[a-z][a-z-]+')
+
+# Light stemmer: case endings by minimum word length, longest first
+# (after J. Dolamic and J. Savoy, "Indexing and stemming approaches for
+# the Czech language", applied to folded text)
+_CASE_SUFFIXES = [
+    (8, ('atech',)),
+    (7, ('etem', 'atum')),
+    (6, ('ech', 'ich', 'eho', 'emi', 'emu', 'ete', 'eti', 'iho', 'imi', 'imu',
+         'ach', 'ata', 'aty', 'ych', 'ama', 'ami', 'ove', 'ovi', 'ymi')),
+    (5, ('em', 'es', 'im', 'um', 'at', 'am', 'os', 'us', 'ym', 'mi', 'ou')),
+    (4, ('a', 'e', 'i', 'o', 'u', 'y')),
+]
+_POSSESSIVE_SUFFIXES = ('ov', 'in', 'uv')
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics ("Žížala" -> "zizala")."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def stem(word: str) -> str:
+    """Strip Czech case and possessive endings from a folded word."""
+    for min_length, suffixes in _CASE_SUFFIXES:
+        if len(word) >= min_length:
+            for suffix in suffixes:
+                if word.endswith(suffix):
+                    word = word[:-len(suffix)]
+                    break
+            else:
+                continue
+            break
+    if len(word) >= 6 and word.endswith(_POSSESSIVE_SUFFIXES):
+        word = word[:-2]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Folded, stemmed index terms of a text, stopwords removed."""
+    return [stem(word) for word in _WORD_RE.findall(fold(text)) if word not in STOPWORDS]
+
+
+def html_to_text(html: str) -> str:
+    """Plain text of rendered page HTML."""
+    return _SPACE_RE.sub(' ', unescape(_TAG_RE.sub(' ', html))).strip()
+
+
+def species_name(html: str) -> Optional[str]:
+    """
+    Latin species name opening a species page ("Abies alba" from
+    "<p>Abies alba <em>Miller</em></p>"), or None.
+    """
+    match = _PARAGRAPH_RE.search(html)
+    if match is None:
+        return None
+    species = _SPECIES_RE.match(html_to_text(match.group(1)))
+    return species.group(0) if species else None
+
+
+def _snippet(text: str) -> str:
+    if len(text) <= SNIPPET_LENGTH:
+        return text
+    return text[:SNIPPET_LENGTH].rsplit(' ', 1)[0] + '…'
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+def content_tile_url(url: str) -> str:
+    """A page's tile.jpg (the app passes its tile_url, which knows placeholders)."""
+    return f"/content/{url}/tile.jpg"
+
+
+class SearchIndex:
+    """
+    Read-only inverted index with BM25 scoring.
+
+    Documents are pages and gallery images, stored as
+    [url, title, snippet, image, gallery index or -1], where image is the
+    gallery image path (PAGE_IMAGE for pages). Postings per term
+    are parallel arrays of document numbers and term frequencies.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version = data['version']
+        self.docs = data['docs']
+        self._postings = data['terms']
+        self._lengths = data['lengths']
+        lengths = self._lengths
+        average = (sum(lengths) / len(lengths)) if lengths else 1.0
+        # BM25 length normalization per document, computed once
+        self._norms = array('f', [K1 * (1 - B + B * length / average) for length in lengths])
+        self._decoded = {}
+        self.suggestions = SuggestIndex(data['suggest'])
+        self.related = data['related']
+
+    # -------------------------------------------------------------------------
+    # Build / load
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, menu: Dict[str, Any]) -> 'SearchIndex':
+        """Index every page in the menu, and its gallery captions."""
+        return cls(build_index_data(menu))
+
+    @classmethod
+    def load(cls, path: Path, version: Optional[str] = None) -> Optional['SearchIndex']:
+        """
+        Load an index written by save().
+
+        Returns None if the file is missing, unreadable or was built from
+        a content version other than `version` (when given).
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if data.get('layout') != LAYOUT or (version is not None and data['version'] != version):
+            return None
+        return cls(data)
+
+    # -------------------------------------------------------------------------
+    # Query
+    # -------------------------------------------------------------------------
+
+    def _get_postings(self, term: str):
+        postings = self._decoded.get(term)
+        if postings is None:
+            encoded = self._postings.get(term)
+            if encoded is None:
+                return None
+            doc_ids = array('I')
+            doc_ids.frombytes(encoded[0])
+            freqs = array('H')
+            freqs.frombytes(encoded[1])
+            postings = self._decoded[term] = (doc_ids, freqs)
+        return postings
+
+    def score(self, terms: List[str]) -> Dict[int, float]:
+        """BM25 score of every document matching any of the terms."""
+        scores: Dict[int, float] = {}
+        total = len(self.docs)
+        norms = self._norms
+        for term in set(terms):
+            postings = self._get_postings(term)
+            if postings is None:
+                continue
+            doc_ids, freqs = postings
+            df = len(doc_ids)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for doc, tf in zip(doc_ids, freqs):
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norms[doc])
+        return scores
+
+    def search(self, query: str, limit: int = 20,
+               tile_url: Callable[[str], str] = content_tile_url) -> List[Dict[str, Any]]:
+        """
+        Search for a query.
+
+        Args:
+            tile_url: Image URL of a page result
+
+        Returns:
+            [{'url': 'ziva-priroda/...', 'title': '...', 'snippet': '...',
+              'image': '/content/ziva-priroda/.../tile.jpg', 'gallery_index': None,
+              'score': 7.31}, ...]
+        """
+        scores = self.score(tokenize(query))
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        results = []
+        for doc, score in best:
+            url, title, snippet, image, gallery_index = self.docs[doc]
+            results.append({
+                'url': url,
+                'title': title,
+                'snippet': snippet,
+                'image': f"/content/{image}" if image != PAGE_IMAGE else tile_url(url),
+                'gallery_index': gallery_index if gallery_index >= 0 else None,
+                'score': score,
+            })
+        return results
+
+    # -------------------------------------------------------------------------
+    # Save
+    # -------------------------------------------------------------------------
+
+    def save(self, path: Path):
+        """Write the index for load() (written aside and renamed into place)."""
+        data = {
+            'layout': LAYOUT,
+            'version': self.version,
+            'docs': self.docs,
+            'lengths': self._lengths,
+            'terms': self._postings,
+            'suggest': self.suggestions.data,
+            'related': self.related,
+        }
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(data, f)
+        tmp_path.replace(path)
+
+
+# =============================================================================
+# Suggestions
+# =============================================================================
+
+def _uint32(data: bytes) -> array:
+    values = array('I')
+    values.frombytes(data)
+    return values
+
+
+class Completion(NamedTuple):
+    """Keys matching a folded query: the range [lo, hi) of the sorted keys."""
+    query: str
+    lo: int
+    hi: int
+
+
+class _KeyList:
+    """Sorted keys as one joined string, indexable for bisect."""
+
+    def __init__(self, text: str, offsets: array):
+        self._text = text
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._text[self._offsets[i]:self._offsets[i + 1] - 1]
+
+
+class SuggestIndex:
+    """
+    Prefix index over folded page titles and species names.
+
+    Every word of a title starts a key running to the end of the title
+    ("racek chechtavy", "chechtavy"), so a query matches titles containing
+    its words in order, the last one typed partially. The keys are sorted;
+    a query is a binary search for the range of keys it prefixes, and the
+    next keystroke searches only inside that range (complete()).
+
+    Entries are numbered in title order, and each key carries the rank of
+    its entry - ahead of the others if the key starts the title or the
+    species name - so the best suggestions are the smallest ranks in range.
+    """
+
+    # Completions kept per process for the next keystroke (or backspace)
+    RECENT = 256
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.entries = data['entries']
+        self._keys = _KeyList(data['keys'], _uint32(data['offsets']))
+        self._ranks = _uint32(data['ranks'])
+        self._recent: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_entries(cls, entries: List[List[str]]) -> 'SuggestIndex':
+        """Index [title, species name or '', url] entries."""
+        return cls(build_suggest_data(entries))
+
+    def complete(self, query: str, previous: Optional[Completion] = None) -> Completion:
+        """
+        Range of keys a query prefixes.
+
+        If `previous` is the completion of a shorter query that this one
+        extends (the previous keystroke), only its range is searched.
+        """
+        query = ' '.join(_WORD_RE.findall(fold(query)))
+        lo, hi = 0, len(self._keys)
+        if previous is not None and query.startswith(previous.query):
+            lo, hi = previous.lo, previous.hi
+        if query and lo < hi:
+            lo = bisect.bisect_left(self._keys, query, lo, hi)
+            hi = bisect.bisect_left(self._keys, query + '{', lo, hi)  # '{' sorts after 'z'
+        return Completion(query, lo, hi)
+
+    def suggest(self, query: str, limit: int = 8,
+                tile_url: Callable[[str], str] = content_tile_url) -> List[Dict[str, Any]]:
+        """
+        Suggestions for a partially typed query, best first.
+
+        Reuses the completion of the previous keystroke when this process
+        answered it.
+
+        Args:
+            tile_url: Image URL of a page
+
+        Returns:
+            [{'title': 'Racek chechtavý', 'species': 'Larus ridibundus',
+              'url': 'ziva-priroda/...', 'image': '/content/ziva-priroda/.../tile.jpg'}, ...]
+        """
+        folded = ' '.join(_WORD_RE.findall(fold(query)))
+        if not folded:
+            return []
+        completion = self._recent_completion(folded)
+        if completion is None:
+            completion = self.complete(folded, self._recent_completion(folded[:-1].rstrip()))
+            with self._lock:
+                self._recent[folded] = completion
+                if len(self._recent) > self.RECENT:
+                    self._recent.popitem(last=False)
+
+        count = len(self.entries)
+        seen = set()
+        results = []
+        for rank in heapq.nsmallest(limit * 2, self._ranks[completion.lo:completion.hi]):
+            number = rank % count
+            if number in seen:
+                continue
+            seen.add(number)
+            title, species, url = self.entries[number]
+            results.append({'title': title, 'species': species, 'url': url, 'image': tile_url(url)})
+            if len(results) == limit:
+                break
+        return results
+
+    def _recent_completion(self, query: str) -> Optional[Completion]:
+        with self._lock:
+            completion = self._recent.get(query)
+            if completion is not None:
+                self._recent.move_to_end(query)
+            return completion
+
+
+def build_suggest_data(entries: List[List[str]]) -> Dict[str, Any]:
+    """
+    Sorted prefix keys for SuggestIndex.
+
+    Returns:
+        {'entries': [[title, species, url], ...] in title order,
+         'keys': sorted keys, each followed by a newline,
+         'offsets': start of each key in 'keys' (plus the end),
+         'ranks': rank per key (entry number, plus the entry count
+         unless the key starts the title or species name)}
+    """
+    entries = sorted(entries, key=lambda entry: (fold(entry[0]), entry[2]))
+    count = len(entries)
+    keys = []
+    for number, (title, species, url) in enumerate(entries):
+        for name in (title, species):
+            words = _WORD_RE.findall(fold(name))
+            for i in range(len(words)):
+                keys.append((' '.join(words[i:]), number + (count if i else 0)))
+    keys.sort()
+
+    offsets = array('I', [0])
+    for key, _ in keys:
+        offsets.append(offsets[-1] + len(key) + 1)
+    return {
+        'entries': entries,
+        'keys': ''.join(key + '\n' for key, _ in keys),
+        'offsets': offsets.tobytes(),
+        'ranks': array('I', [rank for _, rank in keys]).tobytes(),
+    }
+
+
+def build_index_data(menu: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Index every page in the menu and its captioned gallery images.
+
+    Returns:
+        Data for SearchIndex(): {'layout', 'version', 'docs', 'lengths',
+        'terms': {term: (document numbers as uint32 bytes, frequencies as
+        uint16 bytes)}, 'suggest': build_suggest_data() of the pages,
+        'related': {url: [related page url, ...]}}
+    """
+    docs = []
+    lengths = []
+    postings: Dict[str, tuple] = {}
+    suggest_entries = []
+    page_terms: Dict[str, Dict[str, int]] = {}
+
+    def add(doc, title, text):
+        counts: Dict[str, int] = {}
+        for term in tokenize(title):
+            counts[term] = counts.get(term, 0) + TITLE_WEIGHT
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+        number = len(docs)
+        docs.append(doc)
+        lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            doc_ids, freqs = postings.setdefault(term, ([], []))
+            doc_ids.append(number)
+            freqs.append(min(tf, 0xFFFF))
+        return counts
+
+    for url in sorted(menu['by_url']):
+        page = get_page_content(url)
+        if page is None:
+            continue
+        text = html_to_text(page['content'])
+        suggest_entries.append([page['title'], species_name(page['content']) or '', url])
+        terms = page_terms[url] = dict(
+            add([url, page['title'], _snippet(text), PAGE_IMAGE, -1], page['title'], text))
+
+        if page.get('gallery'):
+            gallery = get_gallery(url) or {'images': []}
+            for index, image in enumerate(gallery['images']):
+                if image['caption']:
+                    add([url, page['title'], _snippet(image['caption']), image['path'], index],
+                        '', f"{image['caption']} {image['author']}")
+                    # Captions, but not their authors, describe the page too
+                    for term in tokenize(image['caption']):
+                        terms[term] = terms.get(term, 0) + 1
+
+    # Only exhibit pages (menu leaves) are recommended
+    leaves = {url for url, item in menu['by_url'].items() if not item['children']}
+
+    return {
+        'layout': LAYOUT,
+        'version': menu['version'],
+        'docs': docs,
+        'lengths': lengths,
+        'terms': {
+            term: (array('I', doc_ids).tobytes(), array('H', freqs).tobytes())
+            for term, (doc_ids, freqs) in postings.items()
+        },
+        'suggest': build_suggest_data(suggest_entries),
+        'related': related_pages(page_terms, targets=leaves),
+    }
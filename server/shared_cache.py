@@ -0,0 +1,391 @@
+"""
+Render and fragment caches shared between gunicorn worker processes.
+
+With several workers, the in-process caches in server/cache.py are cold in
+every worker that has not rendered a page itself. This module keeps the
+same entries in one memory-mapped file (on tmpfs by default), so a page
+rendered by one worker is a hit in all of them.
+
+File layout:
+
+    header      magic, layout, slot count, arena size, write offset, next seq
+    stats       per-worker hit/miss counters (pid, then hits and misses
+                of each namespace: render, fragment)
+    slots       open-addressing hash index: key hash -> (seq, offset, length)
+    arena       ring buffer of records: (seq, key hash, length) + payload
+
+Records are appended to the arena and it wraps when full, overwriting the
+oldest records. A slot is only valid while the record at its offset still
+carries the slot's sequence number and key hash, so overwritten entries
+simply miss. Each payload stores the content version it was rendered for.
+
+Concurrency: readers take a shared and writers an exclusive flock() on the
+file; within a process a lock serializes threads, since flock() locks are
+per open file and threads share it. The file is reopened after fork so
+each worker holds its own lock.
+"""
+
+import fcntl
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import threading
+from typing import Optional, Dict, Tuple, Any
+
+from markupsafe import Markup
+
+from server.cache import CachedRender
+
+MAGIC = b'PRKCACHE'
+LAYOUT = 2
+
+HEADER = struct.Struct('<8sIIQQQ')      # magic, layout, nslots, arena size, write offset, next seq
+STAT = struct.Struct('<II4Q')           # pid, unused, (hits, misses) per namespace
+SLOT = struct.Struct('<16sQQI4x')       # key hash, seq, offset, length
+RECORD = struct.Struct('<Q16sI')        # seq, key hash, payload length
+
+STATS_OFFSET = 64
+MAX_WORKERS = 16
+SLOTS_OFFSET = 1024
+
+# Key namespaces, in the order of their counters in a stats row
+NAMESPACES = ('render', 'fragment')
+DEFAULT_SLOTS = 8192
+MAX_PROBES = 8
+
+# A single record may use at most this fraction of the arena
+MAX_RECORD_FRACTION = 8
+
+
+def _key_hash(namespace: str, key) -> bytes:
+    """Stable 16-byte hash of a cache key."""
+    return hashlib.blake2b(f"{namespace}:{key!r}".encode('utf-8'), digest_size=16).digest()
+
+
+class SharedStore:
+    """
+    Memory-mapped key/value store shared by all processes opening `path`.
+
+    Keys are 16-byte hashes, values are (version, payload) pairs of
+    marshal-able Python objects.
+    """
+
+    def __init__(self, path: str, size: int, nslots: int = DEFAULT_SLOTS):
+        self.path = path
+        self.size = size
+        self.nslots = nslots
+        self.arena_offset = SLOTS_OFFSET + nslots * SLOT.size
+        self.arena_size = size - self.arena_offset
+        if self.arena_size <= 0:
+            raise ValueError(f"Shared cache size {size} too small for {nslots} slots")
+
+        self._thread_lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+        self._stat_slot = None
+        self._open()
+
+    # -------------------------------------------------------------------------
+    # File handling
+    # -------------------------------------------------------------------------
+
+    def _open(self):
+        """Open (and if needed initialize) the file in this process."""
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size != self.size:
+                    os.ftruncate(fd, self.size)
+                mapped = mmap.mmap(fd, self.size)
+                magic, layout, nslots, arena_size, _, _ = HEADER.unpack_from(mapped, 0)
+                if (magic, layout, nslots, arena_size) != (MAGIC, LAYOUT, self.nslots, self.arena_size):
+                    self._initialize(mapped)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        except Exception:
+            os.close(fd)
+            raise
+
+        self._fd = fd
+        self._map = mapped
+        self._pid = os.getpid()
+        self._stat_slot = None
+
+    def _initialize(self, mapped):
+        """Write an empty header, stats table and index."""
+        mapped[:self.arena_offset] = bytes(self.arena_offset)
+        HEADER.pack_into(mapped, 0, MAGIC, LAYOUT, self.nslots, self.arena_size, 0, 1)
+
+    def _ensure_process(self):
+        """Reopen after fork so every process holds its own flock()."""
+        if self._pid != os.getpid():
+            self._open()
+
+    def reset(self):
+        """Drop every entry and all worker statistics."""
+        with self._thread_lock:
+            self._ensure_process()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._initialize(self._map)
+                self._stat_slot = None
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    # -------------------------------------------------------------------------
+    # Index
+    # -------------------------------------------------------------------------
+
+    def _slot_offsets(self, key_hash: bytes):
+        start = int.from_bytes(key_hash[:8], 'little') % self.nslots
+        for probe in range(MAX_PROBES):
+            yield SLOTS_OFFSET + ((start + probe) % self.nslots) * SLOT.size
+
+    def _read_valid(self, slot_offset: int) -> Optional[Tuple[bytes, int, int, int]]:
+        """Slot contents if its record has not been overwritten."""
+        key_hash, seq, offset, length = SLOT.unpack_from(self._map, slot_offset)
+        if seq == 0:
+            return None
+        record_seq, record_hash, record_length = RECORD.unpack_from(
+            self._map, self.arena_offset + offset)
+        if (record_seq, record_hash, record_length) != (seq, key_hash, length):
+            return None
+        return key_hash, seq, offset, length
+
+    # -------------------------------------------------------------------------
+    # Statistics
+    # -------------------------------------------------------------------------
+
+    def _count(self, namespace: str, hit: bool):
+        """Add a hit or miss to this worker's counters (thread lock held).
+
+        Only this process writes its own row, so no file lock is needed
+        once the row is claimed.
+        """
+        if self._stat_slot is None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._stat_slot = self._claim_stat_slot()
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            if self._stat_slot is None:
+                return
+        row = list(STAT.unpack_from(self._map, self._stat_slot))
+        row[2 + 2 * NAMESPACES.index(namespace) + (0 if hit else 1)] += 1
+        STAT.pack_into(self._map, self._stat_slot, *row)
+
+    def _claim_stat_slot(self) -> Optional[int]:
+        """Find this process's stats row, reusing rows of exited processes."""
+        pid = os.getpid()
+        free = None
+        for i in range(MAX_WORKERS):
+            offset = STATS_OFFSET + i * STAT.size
+            row_pid = STAT.unpack_from(self._map, offset)[0]
+            if row_pid == pid:
+                return offset
+            if free is None and (row_pid == 0 or not _pid_alive(row_pid)):
+                free = offset
+        if free is not None:
+            STAT.pack_into(self._map, free, pid, 0, 0, 0, 0, 0)
+        return free
+
+    def reset_stats(self):
+        """Release this process's counters (the master's after warm-up)."""
+        with self._thread_lock:
+            self._ensure_process()
+            if self._stat_slot is not None:
+                STAT.pack_into(self._map, self._stat_slot, 0, 0, 0, 0, 0, 0)
+                self._stat_slot = None
+
+    def worker_stats(self, namespace: str) -> Dict[int, Dict[str, Any]]:
+        """Hit/miss counters of every worker using the store, for one namespace."""
+        counter = 2 + 2 * NAMESPACES.index(namespace)
+        with self._thread_lock:
+            self._ensure_process()
+            stats = {}
+            for i in range(MAX_WORKERS):
+                row = STAT.unpack_from(self._map, STATS_OFFSET + i * STAT.size)
+                if row[0]:
+                    pid, hits, misses = row[0], row[counter], row[counter + 1]
+                    total = hits + misses
+                    stats[pid] = {
+                        'hits': hits,
+                        'misses': misses,
+                        'hit_rate': hits / total if total else 0.0,
+                    }
+            return stats
+
+    # -------------------------------------------------------------------------
+    # Get / set
+    # -------------------------------------------------------------------------
+
+    def get(self, key_hash: bytes, version: str, namespace: str):
+        """Return the payload stored for key_hash and version, or None."""
+        with self._thread_lock:
+            self._ensure_process()
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+            try:
+                payload = None
+                for slot_offset in self._slot_offsets(key_hash):
+                    slot = self._read_valid(slot_offset)
+                    if slot is not None and slot[0] == key_hash:
+                        start = self.arena_offset + slot[2] + RECORD.size
+                        stored_version, payload = marshal.loads(self._map[start:start + slot[3]])
+                        if stored_version != version:
+                            payload = None
+                        break
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+            self._count(namespace, payload is not None)
+            return payload
+
+    def set(self, key_hash: bytes, version: str, payload) -> bool:
+        """Store a payload; returns False if it is too large to cache."""
+        data = marshal.dumps((version, payload))
+        record_size = RECORD.size + len(data)
+        if record_size > self.arena_size // MAX_RECORD_FRACTION:
+            return False
+
+        with self._thread_lock:
+            self._ensure_process()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._write(key_hash, data, record_size)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return True
+
+    def _write(self, key_hash: bytes, data: bytes, record_size: int):
+        """Append a record and point the key's slot at it (lock held)."""
+        magic, layout, nslots, arena_size, write_offset, seq = HEADER.unpack_from(self._map, 0)
+        if write_offset + record_size > self.arena_size:
+            write_offset = 0
+
+        start = self.arena_offset + write_offset
+        RECORD.pack_into(self._map, start, seq, key_hash, len(data))
+        self._map[start + RECORD.size:start + record_size] = data
+
+        # Reuse the key's slot, else a free or stale one, else the oldest
+        target = None
+        oldest = None
+        for slot_offset in self._slot_offsets(key_hash):
+            slot = self._read_valid(slot_offset)
+            if slot is None or slot[0] == key_hash:
+                target = slot_offset
+                break
+            if oldest is None or slot[1] < oldest[1]:
+                oldest = (slot_offset, slot[1])
+        if target is None:
+            target = oldest[0]
+        SLOT.pack_into(self._map, target, key_hash, seq, write_offset, len(data))
+
+        HEADER.pack_into(self._map, 0, magic, layout, nslots, arena_size,
+                         write_offset + record_size, seq + 1)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# =============================================================================
+# Cache Adapters
+# =============================================================================
+
+class SharedRenderCache:
+    """RenderCache interface on top of a SharedStore."""
+
+    namespace = 'render'
+
+    def __init__(self, store: SharedStore):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version: str) -> Optional[CachedRender]:
+        payload = self.store.get(_key_hash(self.namespace, key), version, self.namespace)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        status, headers, body, encoded = payload
+        entry = CachedRender(version, status, headers, body)
+        entry.encoded = encoded
+        return entry
+
+    def set(self, key, entry: CachedRender):
+        payload = (entry.status, entry.headers, entry.body, dict(entry.encoded))
+        self.store.set(_key_hash(self.namespace, key), entry.version, payload)
+        entry.dirty = False
+
+    def update(self, key, entry: CachedRender):
+        """Write the entry back so other workers get its encoded variants."""
+        self.set(key, entry)
+
+    def clear(self):
+        self.store.reset()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.store.reset_stats()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pid': os.getpid(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'workers': self.store.worker_stats(self.namespace),
+        }
+
+
+class SharedFragmentCache:
+    """FragmentCache interface on top of a SharedStore."""
+
+    namespace = 'fragment'
+
+    def __init__(self, store: SharedStore):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, version: str) -> Optional[str]:
+        value = self.store.get(_key_hash(self.namespace, key), version, self.namespace)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Markup(value)
+
+    def set(self, key: Tuple, version: str, value: str):
+        self.store.set(_key_hash(self.namespace, key), version, str(value))
+
+    def clear(self):
+        self.store.reset()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.store.reset_stats()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pid': os.getpid(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'workers': self.store.worker_stats(self.namespace),
+        }
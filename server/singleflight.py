@@ -0,0 +1,110 @@
+"""
+Single-flight request coalescing.
+
+When several threads ask for the same key at once (a cold cache after the
+kiosk wakes up, or several LAN kiosks opening the same page), only the
+first one - the leader - does the work; the others wait for it and share
+its result. Waiters give up after a timeout and do the work themselves,
+so a stuck leader never blocks a request for longer than that.
+
+Usage:
+    flights = SingleFlight(timeout=10)
+    content = flights.do(('page', url), get_page_content, url)
+
+Or, when the result is handed over some other way (e.g. a cache):
+    flight, leader = flights.begin(key)
+    if leader:
+        try: ...produce and cache...
+        finally: flights.finish(key, flight)
+    elif flights.wait(flight):
+        ...read the cache...
+"""
+
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class Flight:
+    """One in-progress computation and its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key within a process."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._flights: Dict[Hashable, Flight] = {}
+        self._lock = threading.Lock()
+        self.executed = 0   # Calls that did the work
+        self.coalesced = 0  # Calls answered by another call's result
+        self.timeouts = 0   # Waiters that gave up and did the work
+        self.failed = 0     # Leader calls that raised
+
+    def begin(self, key: Hashable) -> Tuple[Flight, bool]:
+        """Join the flight for `key`; returns (flight, is_leader)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = Flight()
+            self._flights[key] = flight
+            self.executed += 1
+            return flight, True
+
+    def finish(self, key: Hashable, flight: Flight, result: Any = None,
+               error: Optional[BaseException] = None):
+        """Publish the leader's outcome and release the waiters."""
+        flight.result = result
+        flight.error = error
+        with self._lock:
+            if error is not None:
+                self.failed += 1
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.done.set()
+
+    def wait(self, flight: Flight) -> bool:
+        """Wait for a leader; False if it timed out or failed."""
+        if not flight.done.wait(self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            return False
+        if flight.error is not None:
+            return False
+        with self._lock:
+            self.coalesced += 1
+        return True
+
+    def do(self, key: Hashable, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) once for all concurrent callers of `key`."""
+        flight, leader = self.begin(key)
+        if leader:
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                self.finish(key, flight, error=e)
+                raise
+            self.finish(key, flight, result=result)
+            return result
+
+        if self.wait(flight):
+            return flight.result
+        if flight.error is not None and flight.done.is_set():
+            raise flight.error
+        return fn(*args, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since start; `coalesced` is the number of saved calls."""
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts,
+                'failed': self.failed,
+                'in_flight': len(self._flights),
+            }
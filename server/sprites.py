@@ -0,0 +1,152 @@
+"""
+Tile sprite sheets: one image per tile grid page.
+
+A tile page shows up to ITEMS_PER_PAGE tiles, each its own tile.jpg
+request. The sprite build crops every tile of a page to a square cell and
+packs the cells side by side into one fingerprinted JPEG, so the browser
+paints a whole tile page with a single request. Tiles are drawn from the
+sheet as CSS backgrounds; with n cells in a row, cell i sits at
+
+    background-size: (n * 100)% 100%
+    background-position: (i / (n - 1) * 100)% 0
+
+which holds at any tile size. The manifest stores these per tile.
+
+scripts/build-tile-sprites.py writes the sheets and sprites.json into
+server/static/dist/sprites (served and precached like the other built
+assets). Tiles missing from a sheet - new since the build, or no manifest
+for the current content version - fall back to their own tile.jpg.
+"""
+
+import hashlib
+import io
+import json
+from pathlib import Path
+from typing import Optional, Dict, List, Any
+
+from server.assets import DIST_DIR
+from server.content import paginate_menu, get_content_image_path
+
+SPRITE_DIR = DIST_DIR / 'sprites'
+SPRITE_MANIFEST = SPRITE_DIR / 'sprites.json'
+
+# Cell edge in pixels: the largest tile size in variables.css (--tile-max-size)
+SPRITE_CELL = 280
+
+# JPEG quality of the sheets
+SPRITE_QUALITY = 82
+
+
+class TileSprites:
+    """
+    Sprite sheets of the tile pages, from sprites.json.
+
+    Usage:
+        sprites = TileSprites.load(SPRITE_MANIFEST, version, per_page)
+        sprite = sprites.page('ziva-priroda', 1)
+        # {'file': '3f9a0c12be45.jpg', 'size': '800% 100%',
+        #  'positions': {'ziva-priroda/horske-hole': '0% 0', ...}}
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version = data['version']
+        self.per_page = data['per_page']
+        self.pages = data['pages']
+
+    @classmethod
+    def load(cls, path: Path, version: Optional[str] = None,
+             per_page: Optional[int] = None) -> Optional['TileSprites']:
+        """
+        Load a manifest written by build_sprite_sheets().
+
+        Returns None if it is missing or unreadable, or was built for
+        another content version or page size (when given).
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if version is not None and data.get('version') != version:
+            return None
+        if per_page is not None and data.get('per_page') != per_page:
+            return None
+        return cls(data)
+
+    def page(self, parent_url: str, page_num: int) -> Optional[Dict[str, Any]]:
+        """Sheet of a tile page, or None if it has none."""
+        parent_pages = self.pages.get(parent_url, [])
+        if 1 <= page_num <= len(parent_pages):
+            return parent_pages[page_num - 1]
+        return None
+
+
+def sprite_positions(urls: List[str]) -> Dict[str, str]:
+    """CSS background-position of each cell in a row of len(urls) cells."""
+    last = len(urls) - 1
+    return {url: f"{round(i * 100 / last, 4) if last else 0:g}% 0" for i, url in enumerate(urls)}
+
+
+def render_sprite_sheet(paths: List[Path], cell: int = SPRITE_CELL, quality: int = SPRITE_QUALITY) -> bytes:
+    """JPEG of the images cropped to square cells, left to right."""
+    from PIL import Image, ImageOps
+
+    sheet = Image.new('RGB', (cell * len(paths), cell))
+    for position, path in enumerate(paths):
+        with Image.open(path) as tile:
+            # Same crop as object-fit: cover on the <img> tiles
+            sheet.paste(ImageOps.fit(tile.convert('RGB'), (cell, cell), Image.LANCZOS), (position * cell, 0))
+
+    output = io.BytesIO()
+    sheet.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def build_sprite_sheets(menu: Dict[str, Any], per_page: int, output_dir: Path = SPRITE_DIR,
+                        cell: int = SPRITE_CELL) -> Dict[str, Any]:
+    """
+    Write a sprite sheet for every tile page with two or more tiles.
+
+    Sheets are named by a hash of their bytes, so unchanged pages keep
+    their URL (and browser cache) across builds; sheets no longer
+    referenced are removed.
+
+    Returns:
+        The manifest, also written to output_dir / 'sprites.json':
+        {'version', 'per_page', 'cell',
+         'pages': {parent_url: [sheet or None per page]}}
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pages = {}
+    files = set()
+
+    for parent_url, parent_pages in paginate_menu(menu, per_page).items():
+        sheets = []
+        for items in parent_pages:
+            tiles = [(item['url'], get_content_image_path(item['url'], 'tile')) for item in items]
+            tiles = [(url, path) for url, path in tiles if path is not None]
+            if len(tiles) < 2:
+                sheets.append(None)  # Nothing to save over the tile itself
+                continue
+
+            data = render_sprite_sheet([path for _, path in tiles], cell)
+            filename = f"{hashlib.sha1(data).hexdigest()[:12]}.jpg"
+            if filename not in files:
+                (output_dir / filename).write_bytes(data)
+                files.add(filename)
+            sheets.append({
+                'file': filename,
+                'size': f"{len(tiles) * 100}% 100%",
+                'positions': sprite_positions([url for url, _ in tiles]),
+            })
+        if any(sheets):
+            pages[parent_url] = sheets
+
+    for old_file in output_dir.glob('*.jpg'):
+        if old_file.name not in files:
+            old_file.unlink()
+
+    manifest = {'version': menu['version'], 'per_page': per_page, 'cell': cell, 'pages': pages}
+    with open(output_dir / SPRITE_MANIFEST.name, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    return manifest
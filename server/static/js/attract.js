@@ -0,0 +1,198 @@
+/**
+ * Priroda Kiosk - Attract Mode
+ * Full-screen slideshow of gallery photos after the inactivity timeout;
+ * any touch returns to the home screen underneath
+ */
+
+class AttractMode {
+    constructor(options = {}) {
+        this.interval = options.interval || 10000;    // Time per photo
+        this.playlistUrl = options.playlistUrl || '/attract.json';
+        this.poolSize = 3;                            // Shown photo + two decoded ahead
+        this.fadeTime = 1500;                         // Crossfade, as in kiosk.css
+
+        this.playlist = [];
+        this.position = 0;                            // Playlist index of the shown photo
+        this.active = false;
+        this.timer = null;
+
+        this.init();
+    }
+
+    init() {
+        const interval = parseInt(document.body.dataset.attractInterval, 10);
+        if (!interval) {
+            this.disabled = true;
+            return;
+        }
+        this.interval = interval;
+
+        this.buildOverlay();
+
+        // Exit on the first touch, before anything underneath reacts to it
+        ['pointerdown', 'touchstart', 'mousedown'].forEach(eventType => {
+            this.overlay.addEventListener(eventType, (e) => this.exit(e), { passive: false });
+        });
+        document.addEventListener('keydown', (e) => {
+            if (this.active) this.exit(e);
+        });
+
+        // No work while the screen is off
+        document.addEventListener('visibilitychange', () => {
+            if (!this.active) return;
+            if (document.hidden) {
+                clearTimeout(this.timer);
+            } else {
+                this.schedule();
+            }
+        });
+
+        console.log('Attract Mode initialized', { interval: this.interval });
+    }
+
+    buildOverlay() {
+        // Fixed pool of image slots, reused for every photo
+        this.overlay = document.createElement('div');
+        this.overlay.id = 'attract';
+        this.overlay.className = 'attract';
+
+        this.slots = [];
+        for (let i = 0; i < this.poolSize; i++) {
+            const img = document.createElement('img');
+            img.className = 'attract-image';
+            img.alt = '';
+            img.decoding = 'async';
+            this.overlay.appendChild(img);
+            this.slots.push({ img: img, position: -1, ready: Promise.resolve(false) });
+        }
+
+        this.caption = document.createElement('div');
+        this.caption.className = 'attract-caption';
+        this.overlay.appendChild(this.caption);
+
+        const hint = document.createElement('div');
+        hint.className = 'attract-hint';
+        hint.textContent = 'Dotkněte se obrazovky';
+        this.overlay.appendChild(hint);
+
+        document.body.appendChild(this.overlay);
+    }
+
+    async start() {
+        if (this.disabled || this.active) return;
+
+        try {
+            const response = await fetch(this.playlistUrl);
+            const data = await response.json();
+            if (data.version !== this.version) {
+                this.version = data.version;
+                this.playlist = data.images;
+                this.position = 0;
+            }
+        } catch (err) {
+            console.log('Attract playlist unavailable:', err);
+        }
+        if (!this.playlist.length || this.active) return;
+
+        this.active = true;
+
+        // Load the first photo and the two after it
+        this.load(this.slotFor(this.position), this.position);
+        this.refill();
+        await this.slotFor(this.position).ready;
+        if (!this.active) return;
+
+        this.overlay.classList.add('active');
+        this.show(this.position);
+        this.schedule();
+    }
+
+    slotFor(position) {
+        return this.slots[position % this.poolSize];
+    }
+
+    itemAt(position) {
+        return this.playlist[position % this.playlist.length];
+    }
+
+    load(slot, position) {
+        // Decode off the main thread so the crossfade never waits on it
+        slot.position = position;
+        slot.img.src = '/content/' + this.itemAt(position).src;
+        slot.ready = slot.img.decode().then(() => true, () => false);
+    }
+
+    refill() {
+        // Hidden slots take the next photos (the shown one stays until replaced)
+        for (let position = this.position + 1; position < this.position + this.poolSize; position++) {
+            const slot = this.slotFor(position);
+            if (slot.position !== position && !slot.img.classList.contains('visible')) {
+                this.load(slot, position);
+            }
+        }
+    }
+
+    show(position) {
+        this.slots.forEach(slot => slot.img.classList.remove('visible'));
+        this.slotFor(position).img.classList.add('visible');
+
+        const item = this.itemAt(position);
+        this.caption.textContent = item.caption;
+    }
+
+    schedule() {
+        clearTimeout(this.timer);
+        this.timer = setTimeout(() => this.advance(), this.interval);
+    }
+
+    async advance() {
+        const next = this.position + 1;
+
+        // Skip a photo that failed to load, keeping the current one up
+        const ready = await this.slotFor(next).ready;
+        if (!this.active) return;
+
+        this.position = next;
+        if (ready) {
+            this.show(next);
+        }
+
+        // Reuse the slot just hidden once it has faded out
+        setTimeout(() => {
+            if (this.active) this.refill();
+        }, this.fadeTime);
+        this.schedule();
+    }
+
+    exit(e) {
+        if (!this.active) return;
+        e.preventDefault();
+        e.stopPropagation();
+        this.stop();
+
+        if (window.kioskManager) {
+            window.kioskManager.navigateHome();
+        }
+    }
+
+    stop() {
+        if (!this.active) return;
+        this.active = false;
+        clearTimeout(this.timer);
+        this.overlay.classList.remove('active');
+
+        // Release decoded images; the next start loads from the current position
+        this.slots.forEach(slot => {
+            slot.img.classList.remove('visible');
+            slot.img.removeAttribute('src');
+            slot.position = -1;
+            slot.ready = Promise.resolve(false);
+        });
+        this.position += 1;
+    }
+}
+
+// Initialize when DOM is ready
+document.addEventListener('DOMContentLoaded', () => {
+    window.attractMode = new AttractMode();
+});
@@ -0,0 +1,9 @@
+/**
+ * Priroda Kiosk - HTMX Configuration
+ * Must load right after htmx.min.js and before HTMX processes the page
+ */
+
+htmx.config.defaultSwapStyle = 'innerHTML';
+htmx.config.historyCacheSize = 0;
+htmx.config.refreshOnHistoryMiss = true;
+htmx.config.useTemplateFragments = true;
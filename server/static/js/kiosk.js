@@ -9,6 +9,7 @@ class KioskManager {
         this.homeUrl = options.homeUrl || '/';
         this.timer = null;
         this.isFullscreen = false;
+        this.swRegistration = null;
 
         // Check for debug mode via URL parameter
         const urlParams = new URLSearchParams(window.location.search);
@@ -38,6 +39,11 @@ class KioskManager {
         // Bind HTMX events
         this.bindHtmxEvents();
 
+        // Offline precache (service worker)
+        if (document.body.dataset.offlinePrecache === 'true') {
+            this.registerServiceWorker();
+        }
+
         // DISABLED: Kiosk mode features (uncomment for production)
         // this.preventBrowserBehaviors();
         // this.setupFullscreen();
@@ -55,6 +61,10 @@ class KioskManager {
         events.forEach(eventType => {
             document.addEventListener(eventType, () => {
                 this.resetTimer();
+                // A visitor arriving while the slideshow is still starting cancels it
+                if (window.attractMode && eventType !== 'scroll') {
+                    window.attractMode.stop();
+                }
             }, { passive: true });
         });
     }
@@ -79,6 +89,30 @@ class KioskManager {
         });
     }
 
+    registerServiceWorker() {
+        if (!('serviceWorker' in navigator)) {
+            return;
+        }
+
+        navigator.serviceWorker.register('/sw.js', { scope: '/' })
+            .then((registration) => {
+                this.swRegistration = registration;
+                console.log('Service worker registered', registration.scope);
+            })
+            .catch((err) => {
+                console.log('Service worker registration failed:', err);
+            });
+    }
+
+    checkForContentUpdate() {
+        // HTMX navigation never reloads the page, so the browser would not
+        // check sw.js on its own; a new content version installs in the
+        // background and takes over once fully precached
+        if (this.swRegistration) {
+            this.swRegistration.update().catch(() => {});
+        }
+    }
+
     preventBrowserBehaviors() {
         // Prevent context menu (right-click)
         document.addEventListener('contextmenu', (e) => {
@@ -190,6 +224,12 @@ class KioskManager {
     onInactivity() {
         console.log('Inactivity timeout reached, returning to home');
         this.goHome();
+        this.checkForContentUpdate();
+
+        // Photo slideshow over the home screen until the next touch
+        if (window.attractMode) {
+            window.attractMode.start();
+        }
     }
 
     goHome() {
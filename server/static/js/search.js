@@ -0,0 +1,40 @@
+/**
+ * Priroda Kiosk - On-screen Search Keyboard
+ * Types into the search field from the touch keyboard on the search page
+ */
+
+class SearchKeyboard {
+    constructor() {
+        this.init();
+    }
+
+    init() {
+        // Keys are rendered with the search page, so listen on the document
+        document.addEventListener('click', this.handleClick.bind(this));
+
+        console.log('Search Keyboard initialized');
+    }
+
+    handleClick(e) {
+        const key = e.target.closest('.osk-key');
+        const input = document.getElementById('search-input');
+        if (!key || !input) return;
+
+        const value = key.dataset.key;
+        if (value === 'backspace') {
+            input.value = input.value.slice(0, -1);
+        } else if (value === 'clear') {
+            input.value = '';
+        } else {
+            input.value += value;
+        }
+
+        // Same event as typing, so HTMX runs the search
+        input.dispatchEvent(new Event('input', { bubbles: true }));
+    }
+}
+
+// Initialize when DOM is ready
+document.addEventListener('DOMContentLoaded', () => {
+    window.searchKeyboard = new SearchKeyboard();
+});
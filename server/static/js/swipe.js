@@ -1,6 +1,7 @@
 /**
  * Priroda Kiosk - Touch Swipe Handler
- * Handles swipe gestures for gallery navigation and tile pagination
+ * Handles swipe gestures for gallery navigation, tile pagination and
+ * moving between sibling pages
  */
 
 class SwipeHandler {
@@ -14,6 +15,11 @@ class SwipeHandler {
         this.startTime = 0;
         this.isSwiping = false;
 
+        // Prefetched partials (url -> HTML) of the neighbouring pages and
+        // tile pages of what is shown now
+        this.prefetched = new Map();
+        this.preloadImages = options.preloadImages || 8; // Images warmed per partial
+
         this.init();
     }
 
@@ -23,6 +29,20 @@ class SwipeHandler {
         document.addEventListener('touchmove', this.handleTouchMove.bind(this), { passive: false });
         document.addEventListener('touchend', this.handleTouchEnd.bind(this), { passive: true });
 
+        // Warm the neighbours of every page and tile page shown
+        this.prefetchNeighbours();
+        document.body.addEventListener('htmx:afterSettle', () => this.prefetchNeighbours());
+
+        // Tile pagination answered from the prefetched pages
+        document.body.addEventListener('htmx:beforeRequest', (e) => {
+            const html = this.prefetched.get(e.detail.requestConfig.path);
+            const grid = e.detail.target && e.detail.target.closest('.tile-grid-container');
+            if (html !== undefined && grid) {
+                e.preventDefault();
+                this.swapTiles(grid, html);
+            }
+        });
+
         console.log('Swipe Handler initialized');
     }
 
@@ -109,6 +129,12 @@ class SwipeHandler {
             this.handleCustomSwipe(swipeable, direction);
             return;
         }
+
+        // Check for a page with siblings
+        const page = target.closest('.page-container');
+        if (page) {
+            this.handleSiblingSwipe(page, direction);
+        }
     }
 
     handleGallerySwipe(gallery, direction) {
@@ -150,6 +176,117 @@ class SwipeHandler {
         }
     }
 
+    handleSiblingSwipe(page, direction) {
+        // Swipe left moves on to the next sibling, as in the gallery
+        const url = direction === 'left' ? page.dataset.nextUrl : page.dataset.prevUrl;
+        if (!url) return;
+
+        const html = this.prefetched.get(url);
+        if (html !== undefined) {
+            this.swapSibling(url, html);
+        } else if (typeof htmx !== 'undefined') {
+            // Not prefetched yet: the usual HTMX navigation
+            htmx.ajax('GET', url, { target: '#main-content', swap: 'innerHTML' }).then(() => {
+                history.pushState({ htmx: true }, '', url);
+                window.scrollTo(0, 0);
+            });
+        } else {
+            window.location.href = url;
+        }
+    }
+
+    prefetchNeighbours() {
+        // Sibling pages (page-content.html) and adjacent tile pages (tile-grid.html)
+        const urls = [];
+        const page = document.querySelector('#main-content .page-container');
+        if (page) urls.push(page.dataset.prevUrl, page.dataset.nextUrl);
+        const grid = document.querySelector('#main-content .tile-grid-container');
+        if (grid) urls.push(grid.dataset.prevPage, grid.dataset.nextPage);
+        const wanted = urls.filter(Boolean);
+
+        // Keep only the current neighbours
+        for (const url of this.prefetched.keys()) {
+            if (!wanted.includes(url)) this.prefetched.delete(url);
+        }
+
+        wanted.forEach(url => {
+            if (this.prefetched.has(url)) return;
+            this.prefetched.set(url, undefined);  // Requested
+            // Same request as an HTMX navigation, so the server's render cache answers it
+            fetch(url, { headers: { 'HX-Request': 'true' } })
+                .then(response => response.ok ? response.text() : Promise.reject(response.status))
+                .then(html => {
+                    if (!this.prefetched.has(url)) return;  // Moved on meanwhile
+                    this.prefetched.set(url, html);
+                    this.preloadImagesOf(html);
+                })
+                .catch(err => {
+                    this.prefetched.delete(url);
+                    console.log('Prefetch failed:', url, err);
+                });
+        });
+    }
+
+    preloadImagesOf(html) {
+        // Main image and tiles into the browser cache, so the swap shows them at once
+        const fragment = document.createElement('template');
+        fragment.innerHTML = html;
+        const images = fragment.content.querySelectorAll('.page-media img, .tile img');
+        const sources = Array.from(images).slice(0, this.preloadImages).map(img => img.getAttribute('src'));
+        // A tile page's sprite sheet stands in for its tiles
+        fragment.content.querySelectorAll('[data-sprite]').forEach(el => sources.push(el.dataset.sprite));
+        sources.forEach(src => {
+            const preload = new Image();
+            preload.decoding = 'async';
+            preload.src = src;
+        });
+    }
+
+    swapSibling(url, html) {
+        // htmx 1.9 has no public swap API, so the cached partial goes in the
+        // way an innerHTML swap would put it: out-of-band parts first, then
+        // the rest into #main-content, processed for hx- attributes
+        const mainContent = document.getElementById('main-content');
+        const fragment = document.createElement('template');
+        fragment.innerHTML = html;
+
+        fragment.content.querySelectorAll('[hx-swap-oob]').forEach(oob => {
+            oob.remove();
+            const target = document.getElementById(oob.id);
+            if (!target) return;
+            if (oob.getAttribute('hx-swap-oob') === 'innerHTML') {
+                target.replaceChildren(...oob.childNodes);
+            } else {
+                oob.removeAttribute('hx-swap-oob');
+                target.replaceWith(oob);
+            }
+            if (typeof htmx !== 'undefined') htmx.process(oob.isConnected ? oob : target);
+        });
+
+        mainContent.replaceChildren(fragment.content);
+        if (typeof htmx !== 'undefined') htmx.process(mainContent);
+
+        history.pushState({ htmx: true }, '', url);
+        window.scrollTo(0, 0);
+        document.body.dispatchEvent(new CustomEvent('htmx:pushedIntoHistory', {
+            detail: { path: url }, bubbles: true
+        }));
+
+        this.prefetchNeighbours();
+    }
+
+    swapTiles(grid, html) {
+        // The outerHTML swap the pagination buttons ask for
+        const fragment = document.createElement('template');
+        fragment.innerHTML = html;
+        const newGrid = fragment.content.querySelector('.tile-grid-container');
+        if (!newGrid) return;
+
+        grid.replaceWith(newGrid);
+        if (typeof htmx !== 'undefined') htmx.process(newGrid);
+        this.prefetchNeighbours();
+    }
+
     handleCustomSwipe(element, direction) {
         // Dispatch custom event for other components
         const event = new CustomEvent('swipe', {
@@ -0,0 +1,110 @@
+/**
+ * Priroda Kiosk - Offline Service Worker
+ * Precaches every page, partial and image listed in the precache manifest
+ * and serves them cache-first. Generated per content version: a new
+ * version installs into a fresh cache and replaces the old one atomically.
+ */
+
+const VERSION = {{ version|tojson }};
+const CACHE_PREFIX = 'priroda-kiosk-';
+const CACHE_NAME = CACHE_PREFIX + VERSION;
+const MANIFEST_URL = '/precache-manifest.json';
+const PARTIAL_PARAM = '__hx';  // Cache key marker for HTMX partial responses
+const BATCH_SIZE = 8;          // Parallel fetches during install
+
+// Pages and their HTMX partials share URLs, so partials get their own key
+function cacheKey(url, partial) {
+    const parsed = new URL(url, self.location.origin);
+    if (partial) {
+        parsed.searchParams.set(PARTIAL_PARAM, '1');
+    }
+    return parsed.pathname + parsed.search;
+}
+
+async function precacheEntry(cache, entry) {
+    const headers = entry.partial ? { 'HX-Request': 'true' } : {};
+    const response = await fetch(entry.url, { headers, cache: 'no-cache' });
+    if (!response.ok) {
+        throw new Error(`Precache failed for ${entry.url}: ${response.status}`);
+    }
+    await cache.put(cacheKey(entry.url, entry.partial), response);
+}
+
+async function precache() {
+    const response = await fetch(MANIFEST_URL, { cache: 'no-store' });
+    const manifest = await response.json();
+
+    // Content changed between serving sw.js and the manifest; the next
+    // update check picks up the newer worker
+    if (manifest.version !== VERSION) {
+        throw new Error(`Manifest version ${manifest.version} does not match ${VERSION}`);
+    }
+
+    const cache = await caches.open(CACHE_NAME);
+    const entries = manifest.entries;
+    try {
+        for (let i = 0; i < entries.length; i += BATCH_SIZE) {
+            await Promise.all(
+                entries.slice(i, i + BATCH_SIZE).map((entry) => precacheEntry(cache, entry))
+            );
+        }
+    } catch (err) {
+        // Never leave a half-filled cache behind; the old worker keeps serving
+        await caches.delete(CACHE_NAME);
+        throw err;
+    }
+}
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then((names) => Promise.all(
+                names
+                    .filter((name) => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME)
+                    .map((name) => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+async function cacheFirst(request, url) {
+    const partial = request.headers.get('HX-Request') === 'true';
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(cacheKey(url.pathname + url.search, partial));
+    if (cached) {
+        return cached;
+    }
+
+    try {
+        return await fetch(request);
+    } catch (err) {
+        // Server is down and the page is not cached: fall back to home
+        if (request.mode === 'navigate') {
+            const home = await cache.match('/');
+            if (home) {
+                return home;
+            }
+        }
+        throw err;
+    }
+}
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin ||
+        url.pathname === '/sw.js' ||
+        url.pathname === MANIFEST_URL) {
+        return;
+    }
+
+    event.respondWith(cacheFirst(request, url));
+});
@@ -0,0 +1,135 @@
+"""
+Per-request phase timing for the Server-Timing header.
+
+Code on the request path marks its phases:
+
+    with timing.phase('markdown'):
+        html = render_markdown(text)
+    timing.hit('render-cache', entry is not None)
+
+and the app sends the totals as a Server-Timing header, which Chromium
+DevTools shows under Network > Timing:
+
+    Server-Timing: menu;dur=0.04, content;dur=0.61, markdown;dur=2.93,
+                   render-cache;desc="1 miss", total;dur=5.12
+
+Phases nest, and each reports its own time only: a phase entered inside
+another pauses the outer one, so the durations add up to the total.
+
+Timing is collected only between start() and finish() (the app calls them
+when SERVER_TIMING is on); otherwise phase() returns a shared no-op
+context manager after one ContextVar lookup, and content loading outside
+requests (build scripts) is never timed.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+_current: ContextVar[Optional['Timings']] = ContextVar('server_timing', default=None)
+
+
+class Timings:
+    """Phase durations and cache outcomes of one request."""
+
+    __slots__ = ('started', 'durations', 'caches', 'stack')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.caches: Dict[str, List[int]] = {}
+        self.stack: List[list] = []  # [name, start of the running stretch]
+
+    def enter(self, name: str):
+        now = time.perf_counter()
+        if self.stack:
+            outer = self.stack[-1]
+            self.durations[outer[0]] = self.durations.get(outer[0], 0.0) + now - outer[1]
+        self.stack.append([name, now])
+
+    def exit(self):
+        now = time.perf_counter()
+        name, start = self.stack.pop()
+        self.durations[name] = self.durations.get(name, 0.0) + now - start
+        if self.stack:
+            self.stack[-1][1] = now
+
+    def header(self) -> str:
+        """Server-Timing header value, phases in first-entered order."""
+        metrics = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.durations.items()]
+        for name, (hits, misses) in self.caches.items():
+            outcomes = [f"{count} {label}" for count, label in ((hits, 'hit'), (misses, 'miss')) if count]
+            metrics.append(f'{name};desc="{", ".join(outcomes)}"')
+        metrics.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ', '.join(metrics)
+
+
+class _Phase:
+    __slots__ = ('timings', 'name')
+
+    def __init__(self, timings: Timings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.timings.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.exit()
+        return False
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def start():
+    """Begin timing the current request; returns a token for finish()."""
+    return _current.set(Timings())
+
+
+def finish(token) -> Optional[str]:
+    """Stop timing; the Server-Timing header value (None if nothing was timed)."""
+    timings = _current.get()
+    _current.reset(token)
+    return timings.header() if timings is not None else None
+
+
+def phase(name: str):
+    """Context manager timing a phase of the current request (no-op when off)."""
+    timings = _current.get()
+    if timings is None:
+        return _NO_PHASE
+    return _Phase(timings, name)
+
+
+def enter(name: str):
+    """Start a phase that a later leave() ends (for paired callbacks)."""
+    timings = _current.get()
+    if timings is not None:
+        timings.enter(name)
+
+
+def leave():
+    """End the phase started by the last enter()."""
+    timings = _current.get()
+    if timings is not None and timings.stack:
+        timings.exit()
+
+
+def hit(cache: str, found: bool):
+    """Count a cache lookup of the current request."""
+    timings = _current.get()
+    if timings is not None:
+        outcomes = timings.caches.setdefault(cache, [0, 0])
+        outcomes[0 if found else 1] += 1